@@ -8,3 +8,7 @@ class ApiConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "api"
+
+    def ready(self):
+        """Connect signals."""
+        import api.signals  # noqa: F401
@@ -0,0 +1,195 @@
+"""JWT authentication without a user query per request."""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import router
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from reviews.models import User
+
+SNAPSHOT_FIELDS = ("id", "username", "role", "is_superuser", "is_active")
+
+CLAIM_FIELDS = ("username", "role", "is_superuser")
+
+TOKEN_VERSION_CLAIM = "ver"
+
+# Version of tokens issued before versioning was introduced.
+LEGACY_TOKEN_VERSION = 1
+
+_user_caches = {}
+_user_caches_lock = threading.Lock()
+
+
+class UserCache:
+    """Least recently used user snapshots, each kept for ``timeout`` s."""
+
+    def __init__(self, max_size=10000, timeout=30, **kwargs):
+        """Cache options."""
+        self.max_size = max_size
+        self.timeout = timeout
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Snapshot or None if missing or expired."""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            expires, snapshot = item
+            if expires < time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return snapshot
+
+    def set(self, key, snapshot):
+        """Store snapshot evicting least recently used ones."""
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.timeout, snapshot)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def delete(self, key):
+        """Drop snapshot."""
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self):
+        """Drop all snapshots."""
+        with self._lock:
+            self._items.clear()
+
+
+def get_user_cache():
+    """User cache configured in ``settings.AUTH_USER_CACHE``."""
+    options = {name.lower(): value
+               for name, value in settings.AUTH_USER_CACHE.items()}
+    key = tuple(sorted(options.items()))
+    with _user_caches_lock:
+        if key not in _user_caches:
+            _user_caches[key] = UserCache(**options)
+        return _user_caches[key]
+
+
+def forget_user(pk):
+    """Drop user snapshot from every cache."""
+    with _user_caches_lock:
+        caches = list(_user_caches.values())
+    for cache in caches:
+        cache.delete(pk)
+
+
+def partial_user(field_names, values):
+    """User with given fields loaded, others deferred until accessed."""
+    loaded = dict(zip(field_names, values))
+    field_names = [field.attname for field in User._meta.concrete_fields
+                   if field.attname in loaded]
+    return User.from_db(router.db_for_read(User), field_names,
+                        [loaded[name] for name in field_names])
+
+
+def token_claims(token):
+    """Role claims of validated token, None for tokens without them."""
+    if token is None or not all(field in token for field in CLAIM_FIELDS):
+        return None
+    return {field: token[field] for field in CLAIM_FIELDS}
+
+
+def trusted_claims(token):
+    """Role claims to authorize by, only in ``STATELESS`` mode.
+
+    Otherwise roles come from the user, so demoted, deactivated or deleted
+    users lose access before their tokens expire.
+    """
+    if not settings.AUTH_USER_CACHE.get("STATELESS"):
+        return None
+    return token_claims(token)
+
+
+class RoleAccessToken(AccessToken):
+    """Access token carrying username, role, superuser and version claims.
+
+    Raising ``AUTH_TOKEN_VERSION`` revokes all tokens issued before.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        """Token with user claims."""
+        token = super().for_user(user)
+        for field in CLAIM_FIELDS:
+            token[field] = getattr(user, field)
+        token[TOKEN_VERSION_CLAIM] = settings.AUTH_TOKEN_VERSION
+        return token
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """Resolve token users from snapshot cache or token claims.
+
+    Snapshots are dropped on user save or delete in this process; other
+    processes see changes after ``TIMEOUT``. With ``STATELESS`` tokens
+    carrying role claims are trusted without any query until they expire.
+
+    The user is resolved on first access, so requests authorized from token
+    claims alone do not touch it.
+    """
+
+    def authenticate(self, request):
+        """Lazy user and validated token."""
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return (SimpleLazyObject(lambda: self.get_user(validated_token)),
+                validated_token)
+
+    def get_validated_token(self, raw_token):
+        """Valid token of the current version."""
+        validated_token = super().get_validated_token(raw_token)
+        version = validated_token.get(TOKEN_VERSION_CLAIM,
+                                      LEGACY_TOKEN_VERSION)
+        if version != settings.AUTH_TOKEN_VERSION:
+            raise InvalidToken(_("Token has been revoked"))
+        return validated_token
+
+    def get_user(self, validated_token):
+        """User with snapshot fields loaded."""
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+        claims = trusted_claims(validated_token)
+        if claims:
+            return partial_user(
+                (api_settings.USER_ID_FIELD, *claims, "is_active"),
+                (user_id, *claims.values(), True),
+            )
+        cache = get_user_cache()
+        snapshot = cache.get(user_id)
+        if snapshot is None:
+            snapshot = User.objects.filter(
+                **{api_settings.USER_ID_FIELD: user_id}
+            ).values_list(*SNAPSHOT_FIELDS).first()
+            if snapshot is None:
+                raise AuthenticationFailed(_("User not found"),
+                                           code="user_not_found")
+            cache.set(user_id, snapshot)
+        user = partial_user(SNAPSHOT_FIELDS, snapshot)
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"),
+                                       code="user_inactive")
+        return user
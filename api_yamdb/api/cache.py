@@ -0,0 +1,202 @@
+"""HTTP and response caching for read endpoints."""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag, urlencode
+from rest_framework import status
+from rest_framework.response import Response
+
+from api.replicas import replica_may_lag
+
+RESPONSE_CACHE_ALIAS = "responses"
+
+# Changes with usernames shown as authors of reviews and comments.
+AUTHORS_GROUP = "authors"
+
+
+def get_response_cache():
+    """Cache storing serialized responses."""
+    return caches[RESPONSE_CACHE_ALIAS]
+
+
+def get_version_cache():
+    """Cache storing group versions.
+
+    The default cache, so processes sharing it agree on versions, ETags
+    and cache keys.
+    """
+    return caches[DEFAULT_CACHE_ALIAS]
+
+
+def _version_key(group):
+    """Version key of cache group."""
+    return f"api:version:{group}"
+
+
+def get_group_versions(*groups):
+    """Current versions of cache groups by group.
+
+    A version is the time of the last change of the group in ns, or 0 for a
+    group not changed since the cache started. Versions never expire.
+    """
+    keys = {_version_key(group): group for group in groups}
+    stored = get_version_cache().get_many(keys)
+    return {group: stored.get(key, 0) for key, group in keys.items()}
+
+
+def get_group_version(group):
+    """Current version of cache group."""
+    return get_group_versions(group)[group]
+
+
+def invalidate_groups(*groups):
+    """Drop cached responses of groups by bumping their versions."""
+    get_version_cache().set_many(
+        {_version_key(group): time.time_ns() for group in groups}, None
+    )
+
+
+def response_cache_key(group, request, kind="response"):
+    """Key from group version and hash of host, path and sorted query.
+
+    Hashing keeps keys of long or non-ASCII URLs valid for memcached.
+    """
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    location = hashlib.sha256(
+        "\n".join((request.get_host(), request.path, query)).encode()
+    ).hexdigest()
+    return ":".join((
+        f"api:{kind}",
+        group,
+        str(get_group_version(group)),
+        location,
+    ))
+
+
+class CachedResponseMixin:
+    """Store successful responses of ``cache_group`` in response cache.
+
+    Entries of the group are dropped by ``invalidate_groups``. Responses
+    read from a replica right after a change are not stored, they may miss
+    it.
+    """
+
+    cache_group = None
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        """Cached data or handler response stored to cache."""
+        cache = get_response_cache()
+        key = response_cache_key(self.cache_group, request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK and not (
+            replica_may_lag(get_group_version(self.cache_group))
+        ):
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        return response
+
+
+class CachedListMixin(CachedResponseMixin):
+    """Serve list from response cache."""
+
+    def list(self, request, *args, **kwargs):
+        """List from cache."""
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class CachedRetrieveMixin(CachedResponseMixin):
+    """Serve retrieve from response cache."""
+
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve from cache."""
+        return self.cached_response(super().retrieve, request, *args,
+                                    **kwargs)
+
+
+class ConditionalGetMixin:
+    """Answer list and retrieve with 304 before serialization.
+
+    Validators are the row count, max id and max ``conditional_date_field``
+    of the filtered queryset plus the versions of ``get_conditional_group``
+    and ``conditional_related_groups``, groups of rows rendered alongside.
+    Views with a ``cache_group`` keep validators in the response cache next
+    to the response, so cache hits run no aggregate query.
+    """
+
+    cache_group = None
+    conditional_date_field = None
+    conditional_related_groups = ()
+
+    def get_conditional_group(self):
+        """Cache group whose version takes part in validators."""
+        return self.cache_group
+
+    def get_conditional_validators(self):
+        """ETag and Last-Modified timestamp, cached with responses."""
+        if self.cache_group is None:
+            return self.compute_conditional_validators()
+        group = self.get_conditional_group()
+        cache = get_response_cache()
+        key = response_cache_key(group, self.request, kind="validators")
+        validators = cache.get(key)
+        if validators is None:
+            validators = self.compute_conditional_validators()
+            if not replica_may_lag(get_group_version(group)):
+                cache.set(key, validators, settings.RESPONSE_CACHE_TIMEOUT)
+        return validators
+
+    def compute_conditional_validators(self):
+        """ETag and Last-Modified timestamp from the filtered queryset.
+
+        Last-Modified is None while neither the rows nor the groups tell
+        when they last changed.
+        """
+        aggregates = {"count": Count("pk"), "max_id": Max("pk")}
+        if self.conditional_date_field:
+            aggregates["max_date"] = Max(self.conditional_date_field)
+        stats = self.filter_queryset(self.get_queryset()).order_by(
+        ).aggregate(**aggregates)
+        versions = get_group_versions(self.get_conditional_group(),
+                                      *self.conditional_related_groups)
+        changes = [version // 10 ** 9 for version in versions.values()]
+        if stats.get("max_date"):
+            changes.append(int(stats["max_date"].timestamp()))
+        last_modified = max(changes) or None
+        etag = hashlib.md5(
+            repr((sorted(stats.items()), sorted(versions.items()))).encode()
+        ).hexdigest()
+        return quote_etag(etag), last_modified
+
+    def list(self, request, *args, **kwargs):
+        """List unless not modified."""
+        return self.conditional_response(super().list, request, *args,
+                                         **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve unless not modified."""
+        return self.conditional_response(super().retrieve, request, *args,
+                                         **kwargs)
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        """304 for matching validators, otherwise handler response."""
+        etag, last_modified = self.get_conditional_validators()
+        headers = {"ETag": etag}
+        if last_modified is not None:
+            headers["Last-Modified"] = http_date(last_modified)
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if not_modified is not None:
+            return Response(status=not_modified.status_code, headers=headers)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            for header, value in headers.items():
+                response[header] = value
+        return response
@@ -0,0 +1,100 @@
+"""Async views running ORM work in a bounded thread pool.
+
+Django 3.2 has no async ORM, and under ASGI it runs sync views one at a
+time in a single thread. Views wrapped here handle chosen methods in a
+dedicated pool of ``ASYNC_EXECUTOR_WORKERS`` threads instead.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponse
+from rest_framework.permissions import SAFE_METHODS
+
+from api.mail import aqueue_mail
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Thread pool for ORM work."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(settings.ASYNC_EXECUTOR_WORKERS,
+                                           thread_name_prefix="api-orm")
+        return _executor
+
+
+def _call_with_connections(func, *args, **kwargs):
+    """Call func closing expired database connections of the thread."""
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_in_executor(func, *args, **kwargs):
+    """Run func in the ORM executor with the caller's context variables."""
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        get_executor(),
+        functools.partial(context.run, _call_with_connections, func, *args,
+                          **kwargs),
+    )
+
+
+def _rendered_response(view, request, args, kwargs):
+    """Call view and render its response in the calling thread."""
+    response = view(request, *args, **kwargs)
+    if not hasattr(response, "render"):
+        return response
+    response.render()
+    rendered = HttpResponse(response.content, status=response.status_code)
+    for header, value in response.items():
+        rendered[header] = value
+    return rendered
+
+
+def async_view(view, methods=SAFE_METHODS):
+    """Async view serving ``methods`` of view from the ORM executor.
+
+    Other methods run as sync views. Mail queued while serving a request
+    is sent afterwards without blocking the event loop.
+    """
+    sync_view = sync_to_async(view)
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in methods:
+            return await sync_view(request, *args, **kwargs)
+        request.deferred_mail = []
+        response = await run_in_executor(_rendered_response, view, request,
+                                         args, kwargs)
+        for mail in request.deferred_mail:
+            await aqueue_mail(*mail)
+        return response
+
+    return wrapper
+
+
+class AsyncViewMixin:
+    """Serve ``async_methods`` asynchronously when ``ASYNC_VIEWS`` is on."""
+
+    async_methods = SAFE_METHODS
+
+    @classmethod
+    def as_view(cls, *args, **kwargs):
+        """Async view under ASGI deployments."""
+        view = super().as_view(*args, **kwargs)
+        if not settings.ASYNC_VIEWS:
+            return view
+        return async_view(view, cls.async_methods)
@@ -1,21 +1,83 @@
 """Filters for views."""
 
 from django_filters import rest_framework as filters
-from reviews.models import Title
+from rest_framework.filters import SearchFilter
+from reviews.models import Category, Genre, Title
+
+from api.references import slug_ids
+from api.search import search
+
+SLUG_MATCH_CHOICES = (
+    ("contains", "contains"),
+    ("exact", "exact"),
+)
+
+
+class IndexedSearchFilter(SearchFilter):
+    """Search through the search backend.
+
+    Views with one plain search field use indexed search, others LIKE.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        """Filter by every search term."""
+        search_fields = self.get_search_fields(view, request)
+        if not search_fields or len(search_fields) != 1 or (
+            search_fields[0][0] in self.lookup_prefixes
+        ):
+            return super().filter_queryset(request, queryset, view)
+        for term in self.get_search_terms(request):
+            queryset = search(queryset, search_fields[0], term)
+        return queryset
 
 
 class TitlesFilter(filters.FilterSet):
-    """Filter title."""
+    """Filter title.
 
-    name = filters.CharFilter(field_name="name",
-                              lookup_expr="icontains")
-    category = filters.CharFilter(field_name="category__slug",
-                                  lookup_expr="icontains")
-    genre = filters.CharFilter(field_name="genre__slug",
-                               lookup_expr="icontains")
+    ``slug_match=exact`` matches category and genre by whole slugs,
+    comma-separated, instead of by substring.
+    """
+
+    name = filters.CharFilter(method="filter_name")
+    category = filters.CharFilter(method="filter_category")
+    genre = filters.CharFilter(method="filter_genre")
+    slug_match = filters.ChoiceFilter(choices=SLUG_MATCH_CHOICES,
+                                      method="filter_slug_match")
 
     class Meta:
         """Meta filter."""
 
         model = Title
         fields = ["name", "year", "genre", "category"]
+
+    def filter_name(self, queryset, name, value):
+        """Name contains value."""
+        return search(queryset, name, value)
+
+    def exact_slug_ids(self, model, value):
+        """Ids of listed slugs in exact mode, otherwise None."""
+        if self.form.cleaned_data.get("slug_match") != "exact":
+            return None
+        slugs = value.split(",")
+        ids = slug_ids(model, slugs)
+        return [ids[slug] for slug in slugs if slug in ids]
+
+    def filter_category(self, queryset, name, value):
+        """Category slug."""
+        ids = self.exact_slug_ids(Category, value)
+        if ids is None:
+            return queryset.filter(category__slug__icontains=value)
+        return queryset.filter(category_id__in=ids)
+
+    def filter_genre(self, queryset, name, value):
+        """Genre slug."""
+        ids = self.exact_slug_ids(Genre, value)
+        if ids is None:
+            return queryset.filter(genre__slug__icontains=value).distinct()
+        return queryset.filter(pk__in=Title.genre.through.objects.filter(
+            genre_id__in=ids
+        ).values("title_id"))
+
+    def filter_slug_match(self, queryset, name, value):
+        """Mode only, applied by slug filters."""
+        return queryset
@@ -0,0 +1,170 @@
+"""Outbound mail queue."""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+_mail_queues = {}
+_mail_queues_lock = threading.Lock()
+
+
+class ImmediateMailQueue:
+    """Send mail in the calling thread."""
+
+    def __init__(self, batch_size=50, max_retries=5, retry_backoff=1.0,
+                 **kwargs):
+        """Queue options."""
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+    def enqueue(self, subject, body, recipient_list):
+        """Put message to the queue."""
+        self.send_batch([self.build_message(subject, body, recipient_list)])
+
+    def build_message(self, subject, body, recipient_list):
+        """Message from settings sender."""
+        return EmailMessage(subject, body, settings.FROM_EMAIL,
+                            recipient_list)
+
+    def send_batch(self, messages):
+        """Send messages over one connection, retry unsent with backoff."""
+        pending = list(messages)
+        for attempt in range(self.max_retries + 1):
+            try:
+                with get_connection(fail_silently=False) as connection:
+                    while pending:
+                        connection.send_messages(pending[:1])
+                        pending.pop(0)
+                return True
+            except Exception:
+                if attempt == self.max_retries:
+                    logger.exception("Mail batch of %s dropped",
+                                     len(pending))
+                    return False
+                delay = self.retry_backoff * 2 ** attempt
+                logger.warning("Mail batch failed, retry %s messages in %ss",
+                               len(pending), delay)
+                time.sleep(delay)
+        return False
+
+    def flush(self, timeout=None):
+        """Wait for queued messages."""
+
+    def close(self, timeout=None):
+        """Stop queue."""
+
+
+class ThreadPoolMailQueue(ImmediateMailQueue):
+    """Send mail in batches from background worker threads."""
+
+    def __init__(self, workers=2, **kwargs):
+        """Queue options."""
+        super().__init__(**kwargs)
+        self.workers = workers
+        self._queue = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def enqueue(self, subject, body, recipient_list):
+        """Put message to the queue."""
+        self._start()
+        self._queue.put(self.build_message(subject, body, recipient_list))
+
+    def _start(self):
+        """Start workers on first use."""
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for number in range(self.workers):
+                thread = threading.Thread(target=self._work, daemon=True,
+                                          name=f"mail-queue-{number}")
+                thread.start()
+                self._threads.append(thread)
+            atexit.register(self.close)
+
+    def _work(self):
+        """Collect available messages into a batch and send it."""
+        while True:
+            message = self._queue.get()
+            if message is None:
+                self._queue.task_done()
+                return
+            batch = [message]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    message = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if message is None:
+                    stop = True
+                    break
+                batch.append(message)
+            self.send_batch(batch)
+            for _ in range(len(batch) + stop):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def flush(self, timeout=None):
+        """Wait for queued messages."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self, timeout=None):
+        """Send queued messages and stop workers."""
+        threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout)
+
+
+def get_mail_queue():
+    """Mail queue configured in ``settings.MAIL_QUEUE``."""
+    options = dict(settings.MAIL_QUEUE)
+    backend = options.pop("BACKEND")
+    key = (backend, tuple(sorted(options.items())))
+    with _mail_queues_lock:
+        if key not in _mail_queues:
+            _mail_queues[key] = import_string(backend)(
+                **{name.lower(): value for name, value in options.items()}
+            )
+        return _mail_queues[key]
+
+
+def queue_mail(subject, body, recipient_list):
+    """Send mail through the configured queue."""
+    get_mail_queue().enqueue(subject, body, recipient_list)
+
+
+def queue_request_mail(request, subject, body, recipient_list):
+    """Queue mail, or leave it to the async view serving the request."""
+    deferred = getattr(request, "deferred_mail", None)
+    if deferred is None:
+        queue_mail(subject, body, recipient_list)
+    else:
+        deferred.append((subject, body, recipient_list))
+
+
+async def aqueue_mail(subject, body, recipient_list):
+    """Send mail through the configured queue off the event loop."""
+    await sync_to_async(queue_mail, thread_sensitive=False)(
+        subject, body, recipient_list
+    )
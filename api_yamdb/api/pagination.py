@@ -0,0 +1,58 @@
+"""Pagination classes."""
+
+from rest_framework.pagination import CursorPagination
+
+PAGINATION_QUERY_PARAM = "pagination"
+CURSOR_MODE = "cursor"
+
+
+class KeysetPagination(CursorPagination):
+    """Keyset pagination without COUNT(*) and OFFSET scans."""
+
+    page_size_query_param = "limit"
+
+
+class TitleKeysetPagination(KeysetPagination):
+    """Titles by name."""
+
+    ordering = ("name", "id")
+
+
+class ReviewKeysetPagination(KeysetPagination):
+    """Reviews from newest."""
+
+    ordering = ("-pub_date", "-id")
+
+
+class CommentKeysetPagination(KeysetPagination):
+    """Comments from oldest."""
+
+    ordering = ("pub_date", "id")
+
+
+class KeysetPaginationMixin:
+    """Switch a viewset to keyset pagination on request.
+
+    ``?pagination=cursor`` or a ``cursor`` parameter selects
+    ``keyset_pagination_class``, otherwise ``pagination_class`` is used.
+    """
+
+    keyset_pagination_class = None
+
+    def use_keyset_pagination(self):
+        """Keyset mode requested."""
+        params = self.request.query_params
+        return self.keyset_pagination_class is not None and (
+            params.get(PAGINATION_QUERY_PARAM) == CURSOR_MODE
+            or self.keyset_pagination_class.cursor_query_param in params
+        )
+
+    @property
+    def paginator(self):
+        """Paginator for the current request."""
+        if not hasattr(self, "_paginator"):
+            if self.use_keyset_pagination():
+                self._paginator = self.keyset_pagination_class()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
@@ -1,16 +1,27 @@
 """Permissions access."""
 
 from rest_framework.permissions import SAFE_METHODS, BasePermission
+from reviews.models import User
+
+from api.authentication import trusted_claims
 
 
 class AdminReadOnly(BasePermission):
-    """Admin or read."""
+    """Admin or read.
+
+    In ``STATELESS`` mode writes are authorized by token role claims
+    without loading the user.
+    """
 
     def has_permission(self, request, view):
         """GET."""
+        if request.method in SAFE_METHODS:
+            return True
+        claims = trusted_claims(request.auth)
+        if claims is not None:
+            return claims["role"] == User.ADMIN or claims["is_superuser"]
         return (
-            request.method in SAFE_METHODS
-            or request.user.is_authenticated
+            request.user.is_authenticated
             and request.user.is_admin
             or request.user.is_superuser
         )
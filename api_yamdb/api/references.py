@@ -0,0 +1,68 @@
+"""In-process cache of reference tables."""
+
+import threading
+
+from django.db import router
+from reviews.models import Category, Genre
+
+from api.cache import get_group_version
+
+REFERENCE_GROUPS = {
+    Category: "categories",
+    Genre: "genres",
+}
+
+_references = {}
+
+
+class References:
+    """Snapshot of all rows of a reference model.
+
+    Cached instances are shared between requests and must not be changed.
+    """
+
+    def __init__(self, version, objects):
+        """Index rows by primary key and slug."""
+        self.version = version
+        self.by_pk = {obj.pk: obj for obj in objects}
+        self.by_slug = {obj.slug: obj for obj in objects}
+        self.slug_ids = {obj.slug: obj.pk for obj in objects}
+        self._representations = {}
+        self._lock = threading.Lock()
+
+    def representation(self, pk, serializer_class):
+        """Serialized row, built once per snapshot; None for unknown pk."""
+        key = (pk, serializer_class)
+        if key not in self._representations:
+            if pk not in self.by_pk:
+                return None
+            data = serializer_class(self.by_pk[pk]).data
+            with self._lock:
+                self._representations[key] = data
+        return self._representations[key]
+
+
+def get_references(model, slugs=()):
+    """Rows of reference model.
+
+    Reloaded from the primary database when the version of the model cache
+    group changes, or when one of ``slugs`` is missing from the snapshot
+    but stored: another process added it and this one has not seen the
+    version change yet.
+    """
+    version = get_group_version(REFERENCE_GROUPS[model])
+    primary = model.objects.using(router.db_for_write(model))
+    cached = _references.get(model)
+    stale = cached is None or cached.version != version
+    if not stale:
+        missing = [slug for slug in slugs if slug not in cached.by_slug]
+        stale = bool(missing) and primary.filter(slug__in=missing).exists()
+    if stale:
+        cached = References(version, list(primary))
+        _references[model] = cached
+    return cached
+
+
+def slug_ids(model, slugs=()):
+    """Slug to id map of reference model holding stored ``slugs``."""
+    return get_references(model, slugs).slug_ids
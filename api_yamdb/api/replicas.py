@@ -0,0 +1,136 @@
+"""Read replica routing."""
+
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.settings import api_settings
+
+from api.authentication import CachedJWTAuthentication
+
+_read_from_replica = ContextVar("read_from_replica", default=False)
+
+
+def _pin_key(user_id):
+    """Cache key marking recent writes of user."""
+    return f"api:replica:pinned:{user_id}"
+
+
+def reading_from_replica():
+    """Reads of the current request may go to a replica."""
+    return bool(settings.REPLICA_DATABASES) and _read_from_replica.get()
+
+
+def replica_may_lag(changed_ns):
+    """Replica reads may miss a change made at ``changed_ns``."""
+    window = settings.REPLICA_READ_YOUR_WRITES * 10 ** 9
+    return reading_from_replica() and time.time_ns() - changed_ns < window
+
+
+class ReplicaRouter:
+    """Reads of replica-safe requests go to a random replica.
+
+    Everything else, including all writes and code running outside
+    requests, uses the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        """Replica alias or primary."""
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        replicas = settings.REPLICA_DATABASES
+        if replicas and _read_from_replica.get():
+            return random.choice(replicas)
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        """Primary."""
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Primary and replicas hold the same rows."""
+        return True
+
+
+class ReplicaMiddleware:
+    """Mark safe requests for replica reads.
+
+    A user who wrote within ``REPLICA_READ_YOUR_WRITES`` seconds reads from
+    the primary, so their own changes are visible despite replica lag.
+    """
+
+    authentication = CachedJWTAuthentication()
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        """Middleware."""
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def request_user_id(self, request):
+        """User id from valid token without loading user, or None.
+
+        Malformed headers and invalid tokens are left to the view to
+        reject, the request is routed as anonymous.
+        """
+        try:
+            header = self.authentication.get_header(request)
+            raw_token = header and self.authentication.get_raw_token(header)
+            if not raw_token:
+                return None
+            token = self.authentication.get_validated_token(raw_token)
+        except AuthenticationFailed:
+            return None
+        return token.get(api_settings.USER_ID_CLAIM)
+
+    def use_replica(self, request, user_id):
+        """Reads of request may go to a replica."""
+        return request.method in SAFE_METHODS and (
+            user_id is None or not cache.get(_pin_key(user_id))
+        )
+
+    def remember_write(self, request, user_id):
+        """Pin a user who wrote to the primary."""
+        if request.method not in SAFE_METHODS and user_id is not None:
+            cache.set(_pin_key(user_id), True,
+                      settings.REPLICA_READ_YOUR_WRITES)
+
+    def __call__(self, request):
+        """Route reads, remember writes."""
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.REPLICA_DATABASES:
+            return self.get_response(request)
+        user_id = self.request_user_id(request)
+        reset_token = _read_from_replica.set(
+            self.use_replica(request, user_id)
+        )
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_from_replica.reset(reset_token)
+        self.remember_write(request, user_id)
+        return response
+
+    async def __acall__(self, request):
+        """Route reads, remember writes of async requests."""
+        if not settings.REPLICA_DATABASES:
+            return await self.get_response(request)
+        user_id = self.request_user_id(request)
+        reset_token = _read_from_replica.set(
+            self.use_replica(request, user_id)
+        )
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_from_replica.reset(reset_token)
+        self.remember_write(request, user_id)
+        return response
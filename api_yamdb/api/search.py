@@ -0,0 +1,186 @@
+"""Indexed substring search."""
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from reviews.models import Category, Genre, Title, User
+
+SEARCH_FIELDS = {
+    Title: ("name",),
+    User: ("username",),
+    Category: ("name",),
+    Genre: ("name",),
+}
+
+VENDOR_BACKENDS = {
+    "sqlite": "api.search.SQLiteTrigramSearch",
+    "postgresql": "api.search.PostgresTrigramSearch",
+}
+
+
+class LikeSearch:
+    """Case-insensitive substring search with LIKE."""
+
+    def available(self, connection):
+        """Database supports the backend."""
+        return True
+
+    def setup(self, connection):
+        """Create search structures."""
+
+    def teardown(self, connection):
+        """Drop search structures."""
+
+    def filter(self, queryset, field, term):
+        """Rows whose field contains term."""
+        return queryset.filter(**{f"{field}__icontains": term})
+
+
+class SQLiteTrigramSearch(LikeSearch):
+    """FTS5 trigram tables kept in sync by triggers.
+
+    Terms shorter than a trigram fall back to LIKE.
+    """
+
+    min_length = 3
+
+    @staticmethod
+    def search_table(model, field):
+        """FTS table of model field."""
+        column = model._meta.get_field(field).column
+        return f"{model._meta.db_table}_{column}_search"
+
+    def available(self, connection):
+        """SQLite is built with FTS5 and its trigram tokenizer (3.34+)."""
+        try:
+            with transaction.atomic(using=connection.alias), \
+                    connection.cursor() as cursor:
+                cursor.execute(
+                    "CREATE VIRTUAL TABLE temp.trigram_probe "
+                    "USING fts5(value, tokenize='trigram')"
+                )
+                cursor.execute("DROP TABLE temp.trigram_probe")
+        except DatabaseError:
+            return False
+        return True
+
+    def setup(self, connection):
+        """Create FTS tables and triggers, index existing rows."""
+        existing = set(connection.introspection.table_names())
+        with connection.cursor() as cursor:
+            for model, fields in SEARCH_FIELDS.items():
+                table = model._meta.db_table
+                if table not in existing:
+                    continue
+                pk = model._meta.pk.column
+                for field in fields:
+                    column = model._meta.get_field(field).column
+                    fts = self.search_table(model, field)
+                    if fts in existing:
+                        continue
+                    cursor.execute(
+                        f"CREATE VIRTUAL TABLE {fts} USING fts5("
+                        f"{column}, content='{table}', content_rowid='{pk}', "
+                        f"tokenize='trigram')"
+                    )
+                    cursor.execute(
+                        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} "
+                        f"BEGIN INSERT INTO {fts}(rowid, {column}) "
+                        f"VALUES (new.{pk}, new.{column}); END"
+                    )
+                    cursor.execute(
+                        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} "
+                        f"BEGIN INSERT INTO {fts}({fts}, rowid, {column}) "
+                        f"VALUES ('delete', old.{pk}, old.{column}); END"
+                    )
+                    cursor.execute(
+                        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {column} "
+                        f"ON {table} "
+                        f"BEGIN INSERT INTO {fts}({fts}, rowid, {column}) "
+                        f"VALUES ('delete', old.{pk}, old.{column}); "
+                        f"INSERT INTO {fts}(rowid, {column}) "
+                        f"VALUES (new.{pk}, new.{column}); END"
+                    )
+                    cursor.execute(
+                        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"
+                    )
+
+    def teardown(self, connection):
+        """Drop FTS tables and their triggers."""
+        with connection.cursor() as cursor:
+            for model, fields in SEARCH_FIELDS.items():
+                for field in fields:
+                    fts = self.search_table(model, field)
+                    for trigger in ("ai", "ad", "au"):
+                        cursor.execute(
+                            f"DROP TRIGGER IF EXISTS {fts}_{trigger}"
+                        )
+                    cursor.execute(f"DROP TABLE IF EXISTS {fts}")
+
+    def filter(self, queryset, field, term):
+        """Rows whose field contains term, found in FTS table."""
+        if len(term) < self.min_length:
+            return super().filter(queryset, field, term)
+        fts = self.search_table(queryset.model, field)
+        return queryset.filter(pk__in=RawSQL(
+            f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s",
+            ['"{}"'.format(term.replace('"', '""'))],
+        ))
+
+
+class PostgresTrigramSearch(LikeSearch):
+    """pg_trgm GIN indexes serving the icontains lookup."""
+
+    @staticmethod
+    def index_names(model):
+        """Table, column and trigram index name of searched fields."""
+        table = model._meta.db_table
+        for field in SEARCH_FIELDS[model]:
+            column = model._meta.get_field(field).column
+            yield table, column, f"{table}_{column}_trgm"
+
+    def setup(self, connection):
+        """Create trigram indexes."""
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            for model in SEARCH_FIELDS:
+                for table, column, index in self.index_names(model):
+                    cursor.execute(
+                        f'CREATE INDEX IF NOT EXISTS "{index}" '
+                        f'ON "{table}" USING gin '
+                        f'((UPPER("{column}"::text)) gin_trgm_ops)'
+                    )
+
+    def teardown(self, connection):
+        """Drop trigram indexes."""
+        with connection.cursor() as cursor:
+            for model in SEARCH_FIELDS:
+                for _, _, index in self.index_names(model):
+                    cursor.execute(f'DROP INDEX IF EXISTS "{index}"')
+
+
+_backends = {}
+
+
+def get_search_backend(using="default"):
+    """Search backend from SEARCH_BACKEND or database vendor.
+
+    A backend the database does not support is replaced with LikeSearch.
+    """
+    connection = connections[using]
+    backend = getattr(settings, "SEARCH_BACKEND", None) or (
+        VENDOR_BACKENDS.get(connection.vendor, "api.search.LikeSearch")
+    )
+    key = (using, backend)
+    if key not in _backends:
+        search_backend = import_string(backend)()
+        if not search_backend.available(connection):
+            search_backend = LikeSearch()
+        _backends[key] = search_backend
+    return _backends[key]
+
+
+def search(queryset, field, term):
+    """Filter queryset by substring of field."""
+    return get_search_backend(queryset.db).filter(queryset, field, term)
@@ -1,11 +1,16 @@
 """Serializers API."""
 
-from django.shortcuts import get_object_or_404
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
-from rest_framework.relations import SlugRelatedField
+from rest_framework.relations import PKOnlyObject, SlugRelatedField
 from rest_framework.validators import UniqueValidator
 from reviews.models import Category, Comment, Genre, Review, Title, User
 
+from api.references import get_references
+
 
 class UserSerializer(serializers.ModelSerializer):
     """User Serializer."""
@@ -92,22 +97,84 @@ class GenreSerializer(serializers.ModelSerializer):
         )
 
 
-class CategoryTitle(serializers.SlugRelatedField):
-    """CategoryTitle Serializer."""
+class ReferenceSlugField(serializers.SlugRelatedField):
+    """Slug related field resolved through the reference cache."""
+
+    serializer_class = None
+
+    def to_internal_value(self, data):
+        """Cached instance by slug."""
+        if not isinstance(data, str):
+            self.fail("invalid")
+        instance = get_references(self.queryset.model, (data,)).by_slug.get(
+            data
+        )
+        if instance is None:
+            self.fail("does_not_exist", slug_name=self.slug_field,
+                      value=data)
+        return instance
 
     def to_representation(self, value):
-        """For using."""
-        serializer = CategorySerializer(value)
-        return serializer.data
+        """Cached serialized instance."""
+        data = get_references(self.queryset.model).representation(
+            value.pk, self.serializer_class
+        )
+        if data is None:
+            # Row missing from a stale snapshot.
+            if isinstance(value, PKOnlyObject):
+                value = self.get_queryset().filter(pk=value.pk).first()
+            data = value and self.serializer_class(value).data
+        return data
+
+
+class CategoryTitle(ReferenceSlugField):
+    """CategoryTitle Serializer."""
 
+    serializer_class = CategorySerializer
 
-class GenreTitle(serializers.SlugRelatedField):
+    def use_pk_only_optimization(self):
+        """Category is read from cache by ``category_id``."""
+        return True
+
+
+class GenreTitle(ReferenceSlugField):
     """GenreTitle Serializer."""
 
-    def to_representation(self, value):
-        """For using."""
-        serializer = GenreSerializer(value)
-        return serializer.data
+    serializer_class = GenreSerializer
+
+
+def insert_all(model, objs):
+    """Insert objects in one bulk insert setting their primary keys.
+
+    Must run in a transaction. Backends unable to return keys from a bulk
+    insert (SQLite) read back the newest keys: the transaction holds the
+    database write lock until commit, so they belong to the inserted rows.
+    """
+    model.objects.bulk_create(objs)
+    if not objs or objs[0].pk is not None:
+        return
+    pks = model.objects.order_by("-pk").values_list("pk", flat=True)
+    for obj, pk in zip(objs, reversed(pks[:len(objs)])):
+        obj.pk = pk
+
+
+class TitleListSerializer(serializers.ListSerializer):
+    """Titles created in bulk."""
+
+    def create(self, validated_data):
+        """Insert titles and their genre links."""
+        genres = [item.pop("genre", []) for item in validated_data]
+        titles = [Title(**item) for item in validated_data]
+        TitleGenre = Title.genre.through
+        with transaction.atomic():
+            insert_all(Title, titles)
+            TitleGenre.objects.bulk_create(
+                TitleGenre(title_id=title.pk, genre_id=genre_id)
+                for title, title_genres in zip(titles, genres)
+                for genre_id in {genre.pk for genre in title_genres}
+            )
+        prefetch_related_objects(titles, "genre")
+        return titles
 
 
 class TitleSerializer(serializers.ModelSerializer):
@@ -118,14 +185,14 @@ class TitleSerializer(serializers.ModelSerializer):
     )
     genre = GenreTitle(slug_field="slug",
                        queryset=Genre.objects.all(), many=True)
-    rating = serializers.IntegerField(source="reviews__score__avg",
-                                      read_only=True)
+    rating = serializers.IntegerField(read_only=True)
 
     class Meta:
         """Title Meta."""
 
         model = Title
-        fields = "__all__"
+        exclude = ("rating_sum", "rating_count")
+        list_serializer_class = TitleListSerializer
 
 
 class ReviewSerializer(serializers.ModelSerializer):
@@ -140,17 +207,13 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
         read_only_fields = ("title",)
 
-    def validate(self, data):
-        """Review valid."""
-        title_id = self.context["view"].kwargs.get("title_id")
-        author = self.context.get("request").user
-        title = get_object_or_404(Title, pk=title_id)
-        if (
-            title.reviews.filter(author=author).exists()
-            and self.context.get("request").method != "PATCH"
-        ):
+    def create(self, validated_data):
+        """Review create, duplicates rejected by unique_review."""
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
             raise serializers.ValidationError("Уже есть ваш отзыв!")
-        return data
 
     def validate_score(self, value):
         """Score valid."""
@@ -159,6 +222,74 @@ class ReviewSerializer(serializers.ModelSerializer):
         return value
 
 
+class ReviewListSerializer(serializers.ListSerializer):
+    """Reviews of one title created in bulk."""
+
+    def to_internal_value(self, data):
+        """Validate items with authors and existing reviews fetched once."""
+        if isinstance(data, list):
+            usernames = {
+                item["author"] for item in data
+                if isinstance(item, dict)
+                and isinstance(item.get("author"), str)
+            }
+            title = self.context["view"].get_title()
+            self.context["authors"] = User.objects.filter(
+                username__in=usernames
+            ).in_bulk(field_name="username")
+            self.context["reviewed"] = set(Review.objects.filter(
+                title=title, author__username__in=usernames
+            ).values_list("author__username", flat=True))
+        return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        """Insert reviews and shift ratings once per title."""
+        reviews = [Review(**item) for item in validated_data]
+        ratings = defaultdict(lambda: [0, 0])
+        for review in reviews:
+            ratings[review.title_id][0] += review.score
+            ratings[review.title_id][1] += 1
+        try:
+            with transaction.atomic():
+                Review.objects.bulk_create(reviews)
+                for title_id, (score, count) in ratings.items():
+                    Title.shift_rating(title_id, score, count)
+        except IntegrityError:
+            raise serializers.ValidationError("Уже есть ваш отзыв!")
+        if any(review.pk is None for review in reviews):
+            ids = {
+                (title_id, author_id): pk
+                for pk, title_id, author_id in Review.objects.filter(
+                    title_id__in=ratings,
+                    author__in=[review.author for review in reviews],
+                ).values_list("pk", "title_id", "author_id")
+            }
+            for review in reviews:
+                review.pk = ids[review.title_id, review.author_id]
+        return reviews
+
+
+class BulkReviewSerializer(ReviewSerializer):
+    """Review with author given by username, for bulk import."""
+
+    author = serializers.CharField(max_length=150)
+
+    class Meta(ReviewSerializer.Meta):
+        """Bulk Review Meta."""
+
+        list_serializer_class = ReviewListSerializer
+
+    def validate_author(self, value):
+        """Existing user without review of the title in this batch."""
+        author = self.context["authors"].get(value)
+        if author is None:
+            raise serializers.ValidationError("Пользователь не найден!")
+        if value in self.context["reviewed"]:
+            raise serializers.ValidationError("Уже есть ваш отзыв!")
+        self.context["reviewed"].add(value)
+        return author
+
+
 class CommentSerializer(serializers.ModelSerializer):
     """Comment Serializer."""
 
@@ -0,0 +1,106 @@
+"""Model signals."""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+from api.authentication import forget_user
+from api.cache import AUTHORS_GROUP, invalidate_groups
+from api.references import REFERENCE_GROUPS
+
+CACHE_GROUPS = {
+    Category: ("categories", "titles"),
+    Genre: ("genres", "titles"),
+    Title: ("titles",),
+    Review: ("titles",),
+    Title.genre.through: ("titles",),
+}
+
+PARENT_CACHE_GROUPS = {
+    Review: ("reviews", "title_id"),
+    Comment: ("comments", "review_id"),
+}
+
+
+# Genre links change through m2m_changed. Deleted comments change the row
+# count in conditional GET validators, so comments are left to fast delete.
+SAVE_SENDERS = (Category, Genre, Title, Review, Comment)
+DELETE_SENDERS = (Category, Genre, Title, Review)
+
+
+def invalidate_now_and_on_commit(*groups):
+    """Bump groups now and once the change is committed.
+
+    A response cached by a concurrent read before the commit holds old rows
+    under the first version, the second bump drops it.
+    """
+    invalidate_groups(*groups)
+    transaction.on_commit(lambda: invalidate_groups(*groups))
+
+
+def invalidate_response_cache(sender, instance, **kwargs):
+    """Drop cached responses showing the changed model."""
+    groups = list(CACHE_GROUPS.get(sender, ()))
+    if sender in PARENT_CACHE_GROUPS:
+        prefix, parent_field = PARENT_CACHE_GROUPS[sender]
+        groups.append(f"{prefix}:{getattr(instance, parent_field)}")
+    invalidate_now_and_on_commit(*groups)
+
+
+for model in SAVE_SENDERS:
+    post_save.connect(invalidate_response_cache, sender=model)
+for model in DELETE_SENDERS:
+    post_delete.connect(invalidate_response_cache, sender=model)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+def invalidate_references(sender, **kwargs):
+    """Reload reference cache again once the change is committed.
+
+    A snapshot taken inside the transaction may hold uncommitted rows.
+    """
+    transaction.on_commit(
+        lambda: invalidate_groups(REFERENCE_GROUPS[sender])
+    )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    """Drop cached snapshot now and once the change is committed."""
+    forget_user(instance.pk)
+    transaction.on_commit(lambda: forget_user(instance.pk))
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_names(sender, instance, created, update_fields,
+                            **kwargs):
+    """Drop validators of reviews and comments showing a renamed author."""
+    saved_username = update_fields is None or "username" in update_fields
+    stored = getattr(instance, "_stored_username", None)
+    if not created and saved_username and stored != instance.username:
+        invalidate_now_and_on_commit(AUTHORS_GROUP)
+    instance._stored_username = instance.username
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, action, **kwargs):
+    """Drop cached titles after genre links change."""
+    if action.startswith("post_"):
+        invalidate_now_and_on_commit(*CACHE_GROUPS[sender])
+
+
+@receiver(connection_created)
+def tune_sqlite(sender, connection, **kwargs):
+    """Apply SQLITE_PRAGMAS to new SQLite connections."""
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in getattr(settings, "SQLITE_PRAGMAS", {}).items():
+            cursor.execute(f"PRAGMA {pragma} = {value}")
@@ -0,0 +1,37 @@
+"""Throttling."""
+
+import hashlib
+
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class ConfirmationCodeIPThrottle(SimpleRateThrottle):
+    """Confirmation code attempts per client address."""
+
+    scope = "confirmation_code_ip"
+
+    def get_cache_key(self, request, view):
+        """Client address."""
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": self.get_ident(request),
+        }
+
+
+class ConfirmationCodeUsernameThrottle(SimpleRateThrottle):
+    """Confirmation code attempts per username."""
+
+    scope = "confirmation_code"
+
+    def get_cache_key(self, request, view):
+        """Hash of username from request body.
+
+        Raw usernames are unvalidated and may not be valid cache keys.
+        """
+        if not isinstance(request.data, dict):
+            return None
+        username = request.data.get("username")
+        if not username:
+            return None
+        ident = hashlib.sha256(str(username).encode()).hexdigest()
+        return self.cache_format % {"scope": self.scope, "ident": ident}
@@ -1,22 +1,28 @@
 """API views."""
 
 from django.conf import settings
+from django.contrib.auth.models import update_last_login
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
 from django.db import IntegrityError
-from django.db.models import Avg
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, mixins, permissions, status, viewsets
+from rest_framework import mixins, permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 from reviews.models import Category, Genre, Review, Title, User
 
-from api.filters import TitlesFilter
+from api.authentication import RoleAccessToken
+from api.cache import (AUTHORS_GROUP, CachedListMixin, CachedRetrieveMixin,
+                       ConditionalGetMixin, invalidate_groups)
+from api.filters import IndexedSearchFilter, TitlesFilter
+from api.executor import AsyncViewMixin
+from api.mail import queue_request_mail
+from api.pagination import (CommentKeysetPagination, KeysetPaginationMixin,
+                            ReviewKeysetPagination, TitleKeysetPagination)
 from api.permissions import Admin, AdminModerAuthorReadOnly, AdminReadOnly
 from api.serializers import (
+    BulkReviewSerializer,
     CategorySerializer,
     CommentSerializer,
     GenreSerializer,
@@ -26,6 +32,8 @@ from api.serializers import (
     TokenSerializer,
     UserSerializer,
 )
+from api.throttling import (ConfirmationCodeIPThrottle,
+                            ConfirmationCodeUsernameThrottle)
 
 
 class GetPostDeleteViewSet(
@@ -37,9 +45,39 @@ class GetPostDeleteViewSet(
     """Custom mixin."""
 
 
-class SignInView(APIView):
+class BulkCreateMixin:
+    """``POST .../bulk/`` creating an array of objects in one transaction.
+
+    Items are validated in one pass; on any error nothing is created and
+    errors are returned per item, in the order of the input.
+    """
+
+    bulk_max_items = 1000
+
+    @action(detail=False, methods=["post"], permission_classes=[Admin])
+    def bulk(self, request, *args, **kwargs):
+        """Create objects from array."""
+        if (isinstance(request.data, list)
+                and len(request.data) > self.bulk_max_items):
+            return Response(
+                {"detail": f"Не больше {self.bulk_max_items} объектов."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        self.perform_bulk_create(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def perform_bulk_create(self, serializer):
+        """Save objects."""
+        serializer.save()
+
+
+class SignInView(AsyncViewMixin, APIView):
     """Register view."""
 
+    async_methods = ("POST",)
+
     def post(self, request):
         """Registration."""
         serializer = SignInSerializer(data=request.data)
@@ -53,13 +91,8 @@ class SignInView(APIView):
                 return Response(serializer.errors,
                                 status=status.HTTP_400_BAD_REQUEST)
             confirmation_code = default_token_generator.make_token(user)
-            send_mail(
-                settings.MAIL_SUBJECT,
-                confirmation_code,
-                settings.FROM_EMAIL,
-                [user.email],
-                fail_silently=False,
-            )
+            queue_request_mail(request, settings.MAIL_SUBJECT,
+                               confirmation_code, [user.email])
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -67,6 +100,9 @@ class SignInView(APIView):
 class TokenView(APIView):
     """Obtain Token."""
 
+    throttle_classes = (ConfirmationCodeIPThrottle,
+                        ConfirmationCodeUsernameThrottle)
+
     def post(self, request):
         """Get token."""
         serializer = TokenSerializer(data=request.data)
@@ -74,20 +110,20 @@ class TokenView(APIView):
             username = serializer.data["username"]
             confirmation_code = serializer.data["confirmation_code"]
             user = get_object_or_404(User, username=username)
-            if confirmation_code != user.confirmation_code:
+            if not default_token_generator.check_token(user,
+                                                       confirmation_code):
                 return Response(serializer.errors,
                                 status=status.HTTP_400_BAD_REQUEST)
-            token = RefreshToken.for_user(user)
-            return Response(
-                {"token": str(token.access_token)}, status=status.HTTP_200_OK
-            )
+            update_last_login(None, user)
+            token = RoleAccessToken.for_user(user)
+            return Response({"token": str(token)}, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 class UserViewSet(viewsets.ModelViewSet):
     """View user(s)."""
 
-    filter_backends = (filters.SearchFilter,)
+    filter_backends = (IndexedSearchFilter,)
     search_fields = ("username",)
     lookup_field = "username"
     queryset = User.objects.all()
@@ -104,7 +140,7 @@ class UserViewSet(viewsets.ModelViewSet):
     )
     def own_profile(self, request):
         """See youself."""
-        user = self.request.user
+        user = get_object_or_404(User, pk=request.user.pk)
         if request.method == "GET":
             serializer = UserSerializer(user)
             return Response(serializer.data)
@@ -118,67 +154,130 @@ class UserViewSet(viewsets.ModelViewSet):
             return Response(serializer.data)
 
 
-class CategoryViewSet(GetPostDeleteViewSet):
+class CategoryViewSet(CachedListMixin, GetPostDeleteViewSet):
     """View category."""
 
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [AdminReadOnly]
-    filter_backends = (DjangoFilterBackend, filters.SearchFilter)
+    filter_backends = (DjangoFilterBackend, IndexedSearchFilter)
     search_fields = ["name"]
     lookup_field = "slug"
+    cache_group = "categories"
 
 
-class GenreViewSet(GetPostDeleteViewSet):
+class GenreViewSet(CachedListMixin, GetPostDeleteViewSet):
     """View genre."""
 
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = [AdminReadOnly]
-    filter_backends = (DjangoFilterBackend, filters.SearchFilter)
+    filter_backends = (DjangoFilterBackend, IndexedSearchFilter)
     search_fields = ("name",)
     lookup_field = "slug"
+    cache_group = "genres"
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(AsyncViewMixin, ConditionalGetMixin, CachedListMixin,
+                   CachedRetrieveMixin, KeysetPaginationMixin, BulkCreateMixin,
+                   viewsets.ModelViewSet):
     """View title."""
 
-    queryset = Title.objects.all().annotate(
-        Avg("reviews__score")).order_by("name")
+    queryset = Title.objects.prefetch_related("genre").order_by("name")
     permission_classes = [AdminReadOnly]
     serializer_class = TitleSerializer
     filterset_class = TitlesFilter
+    keyset_pagination_class = TitleKeysetPagination
+    cache_group = "titles"
+
+    def perform_bulk_create(self, serializer):
+        """Save titles, bulk inserts send no signals."""
+        serializer.save()
+        invalidate_groups(self.cache_group)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(AsyncViewMixin, ConditionalGetMixin,
+                    KeysetPaginationMixin, BulkCreateMixin,
+                    viewsets.ModelViewSet):
     """View review."""
 
     serializer_class = ReviewSerializer
     permission_classes = [AdminModerAuthorReadOnly]
+    keyset_pagination_class = ReviewKeysetPagination
+    conditional_date_field = "pub_date"
+    conditional_related_groups = (AUTHORS_GROUP,)
+
+    def get_conditional_group(self):
+        """Reviews of the title."""
+        return f"reviews:{self.kwargs.get('title_id')}"
+
+    def get_title(self):
+        """Title from URL, fetched once per request."""
+        if not hasattr(self, "_title"):
+            self._title = get_object_or_404(Title,
+                                            pk=self.kwargs.get("title_id"))
+        return self._title
+
+    def list(self, request, *args, **kwargs):
+        """Reviews of an existing title."""
+        self.get_title()
+        return super().list(request, *args, **kwargs)
 
     def get_queryset(self):
         """GET review."""
-        title = get_object_or_404(Title, pk=self.kwargs.get("title_id"))
-        return title.reviews.all()
+        return Review.objects.filter(
+            title_id=self.kwargs.get("title_id")
+        ).select_related("author").only(
+            "id", "title_id", "text", "score", "pub_date", "author__username"
+        )
+
+    def get_serializer_class(self):
+        """Bulk import names authors."""
+        if self.action == "bulk":
+            return BulkReviewSerializer
+        return self.serializer_class
 
     def perform_create(self, serializer):
         """CREATE review."""
-        title = get_object_or_404(Title, pk=self.kwargs.get("title_id"))
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(author=self.request.user, title=self.get_title())
 
+    def perform_bulk_create(self, serializer):
+        """Save reviews, bulk inserts send no signals."""
+        title = self.get_title()
+        serializer.save(title=title)
+        invalidate_groups("titles", f"reviews:{title.pk}")
 
-class CommentViewSet(viewsets.ModelViewSet):
+
+class CommentViewSet(AsyncViewMixin, ConditionalGetMixin,
+                     KeysetPaginationMixin, viewsets.ModelViewSet):
     """View comment."""
 
     serializer_class = CommentSerializer
     permission_classes = [AdminModerAuthorReadOnly]
+    keyset_pagination_class = CommentKeysetPagination
+    conditional_date_field = "pub_date"
+    conditional_related_groups = (AUTHORS_GROUP,)
+
+    def get_conditional_group(self):
+        """Comments of the review."""
+        return f"comments:{self.kwargs.get('review_id')}"
+
+    def get_review(self):
+        """Review of the title from URL, fetched once per request."""
+        if not hasattr(self, "_review"):
+            self._review = get_object_or_404(
+                Review,
+                pk=self.kwargs.get("review_id"),
+                title_id=self.kwargs.get("title_id"),
+            )
+        return self._review
 
     def get_queryset(self):
         """GET comment."""
-        review = get_object_or_404(Review, pk=self.kwargs.get("review_id"))
-        return review.comments.all()
+        return self.get_review().comments.select_related("author").only(
+            "id", "review_id", "text", "pub_date", "author__username"
+        )
 
     def perform_create(self, serializer):
         """CREATE comment."""
-        review = get_object_or_404(Review, pk=self.kwargs.get("review_id"))
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_review())
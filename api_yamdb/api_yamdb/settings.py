@@ -28,6 +28,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'api.replicas.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -58,14 +59,107 @@ WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
 
 # Database
+# SQLite by default. DB_ENGINE=django.db.backends.postgresql with DB_NAME,
+# DB_USER, DB_PASSWORD, DB_HOST and DB_PORT selects PostgreSQL. Connections
+# are kept open for DB_CONN_MAX_AGE seconds; behind a transaction pooling
+# PgBouncer set DB_DISABLE_SERVER_SIDE_CURSORS=1.
+
+DB_ENGINE = os.getenv('DB_ENGINE', 'django.db.backends.sqlite3')
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'ENGINE': DB_ENGINE,
+        'NAME': os.getenv('DB_NAME', BASE_DIR / 'db.sqlite3'),
+        'USER': os.getenv('DB_USER', ''),
+        'PASSWORD': os.getenv('DB_PASSWORD', ''),
+        'HOST': os.getenv('DB_HOST', ''),
+        'PORT': os.getenv('DB_PORT', ''),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        'DISABLE_SERVER_SIDE_CURSORS': (
+            os.getenv('DB_DISABLE_SERVER_SIDE_CURSORS', '') == '1'
+        ),
+        'OPTIONS': {},
+    }
+}
+
+if DB_ENGINE == 'django.db.backends.sqlite3':
+    # Seconds a write waits for the database lock before failing.
+    DATABASES['default']['OPTIONS']['timeout'] = int(
+        os.getenv('DB_TIMEOUT', 20)
+    )
+else:
+    DATABASES['default']['OPTIONS']['connect_timeout'] = int(
+        os.getenv('DB_TIMEOUT', 10)
+    )
+
+# Read replicas: comma-separated hosts, or database files for SQLite.
+# GET requests read from a random replica unless the user wrote within
+# REPLICA_READ_YOUR_WRITES seconds.
+
+DB_REPLICAS = [name for name in os.getenv('DB_REPLICAS', '').split(',')
+               if name]
+REPLICA_DATABASES = [f'replica{index}'
+                     for index in range(1, len(DB_REPLICAS) + 1)]
+REPLICA_LOCATION = (
+    'NAME' if DB_ENGINE == 'django.db.backends.sqlite3' else 'HOST'
+)
+for alias, replica in zip(REPLICA_DATABASES, DB_REPLICAS):
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        REPLICA_LOCATION: replica,
+        'TEST': {'MIRROR': 'default'},
     }
+
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+
+REPLICA_READ_YOUR_WRITES = int(os.getenv('REPLICA_READ_YOUR_WRITES', 5))
+
+# Pragmas run on every new SQLite connection. WAL lets readers proceed
+# during a write and commits without rewriting the database file.
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('DB_SQLITE_JOURNAL_MODE', 'wal'),
+    'synchronous': os.getenv('DB_SQLITE_SYNCHRONOUS', 'normal'),
+}
+
+# Cache
+# Local memory by default; point CACHE_BACKEND/CACHE_LOCATION and
+# RESPONSE_CACHE_BACKEND/RESPONSE_CACHE_LOCATION to a shared cache
+# (memcached, database, file) when running several processes. The default
+# cache keeps cache group versions, which never expire.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    },
+    'responses': {
+        'BACKEND': os.getenv(
+            'RESPONSE_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.getenv('RESPONSE_CACHE_LOCATION', 'responses'),
+    },
 }
 
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', 600))
+
+# Search
+# Empty value selects FTS5 trigram tables on SQLite and pg_trgm indexes on
+# PostgreSQL, created by migration reviews.0013_search. SQLite builds
+# without the trigram tokenizer (before 3.34) and other databases use
+# 'api.search.LikeSearch', which disables indexed search.
+
+SEARCH_BACKEND = os.getenv('SEARCH_BACKEND')
+
+# Async views
+# asgi.py turns ASYNC_VIEWS on: title, review and comment reads and sign up
+# then run in a pool of ASYNC_EXECUTOR_WORKERS threads.
+
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', '') == '1'
+ASYNC_EXECUTOR_WORKERS = int(os.getenv('ASYNC_EXECUTOR_WORKERS', 8))
+
 # Custom User Model
 AUTH_USER_MODEL = 'reviews.User'
 
@@ -113,13 +207,17 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.AllowAny",
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
     ),
+    'DEFAULT_THROTTLE_RATES': {
+        'confirmation_code': '5/minute',
+        'confirmation_code_ip': '30/minute',
+    },
 }
 
 SIMPLE_JWT = {
@@ -127,5 +225,28 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+AUTH_TOKEN_VERSION = int(os.getenv('AUTH_TOKEN_VERSION', 1))
+
+AUTH_USER_CACHE = {
+    'MAX_SIZE': 10000,
+    'TIMEOUT': 30,
+    'STATELESS': os.getenv('AUTH_STATELESS', '') == '1',
+}
+
 MAIL_SUBJECT = 'Код подтверждения регистрации'
 FROM_EMAIL = 'yamdb.host@yandex.ru'
+
+# SMTP by default; EMAIL_BACKEND=django.core.mail.backends.filebased.
+# EmailBackend writes messages to EMAIL_FILE_PATH instead.
+EMAIL_BACKEND = os.getenv(
+    'EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend'
+)
+EMAIL_FILE_PATH = os.getenv('EMAIL_FILE_PATH', BASE_DIR / 'sent_emails')
+
+MAIL_QUEUE = {
+    'BACKEND': os.getenv('MAIL_QUEUE_BACKEND', 'api.mail.ThreadPoolMailQueue'),
+    'WORKERS': 2,
+    'BATCH_SIZE': 50,
+    'MAX_RETRIES': 5,
+    'RETRY_BACKOFF': 1.0,
+}
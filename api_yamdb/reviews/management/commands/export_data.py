@@ -0,0 +1,156 @@
+"""Export files."""
+
+import csv
+import gzip
+import json
+import os
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from reviews.management.commands.load_data import DICT, FOREIGN_KEY_FIELDS
+from reviews.models import Comment, Review, Title, User
+
+EXPORT_PATH = 'export/'
+
+DEFAULT_CHUNK_SIZE = 2000
+
+FORMATS = ('csv', 'ndjson')
+
+EXPORT_FIELDS = {
+    User: ('id', 'username', 'email', 'role', 'bio',
+           'first_name', 'last_name'),
+    Title: ('id', 'name', 'year', 'description', 'category_id'),
+}
+
+DATE_FIELDS = {
+    User: 'date_joined',
+    Review: 'pub_date',
+    Comment: 'pub_date',
+}
+
+
+def export_columns(model):
+    """Exported attribute names and their column names.
+
+    Columns match ``load_data`` files, so exports can be loaded back.
+    """
+    fields = EXPORT_FIELDS.get(model) or [
+        field.attname for field in model._meta.concrete_fields
+    ]
+    renamed = {f'{field}_id': field for field in FOREIGN_KEY_FIELDS}
+    return list(fields), [renamed.get(field, field) for field in fields]
+
+
+def parse_since(value):
+    """Aware datetime from ISO date or datetime."""
+    since = parse_datetime(value)
+    if since is None:
+        date = parse_date(value)
+        if date is None:
+            raise CommandError(f'Неверная дата: {value}')
+        since = datetime.combine(date, datetime.min.time())
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def export_rows(model, fields, since=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Stream rows of model in primary key order."""
+    queryset = model.objects.order_by('pk')
+    if since and model in DATE_FIELDS:
+        queryset = queryset.filter(**{f'{DATE_FIELDS[model]}__gte': since})
+    return queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+
+
+def write_csv(file, columns, rows):
+    """Write rows as CSV."""
+    writer = csv.writer(file)
+    writer.writerow(columns)
+    count = 0
+    for row in rows:
+        writer.writerow(
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in row
+        )
+        count += 1
+    return count
+
+
+def write_ndjson(file, columns, rows):
+    """Write rows as newline-delimited JSON."""
+    count = 0
+    for row in rows:
+        file.write(json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder,
+                              ensure_ascii=False))
+        file.write('\n')
+        count += 1
+    return count
+
+
+WRITERS = {
+    'csv': write_csv,
+    'ndjson': write_ndjson,
+}
+
+
+class Command(BaseCommand):
+    """Класс выполнения."""
+
+    help = 'Export database into csv or ndjson files'
+
+    def add_arguments(self, parser):
+        """Command options."""
+        parser.add_argument(
+            '--path',
+            default=EXPORT_PATH,
+            help='Directory for exported files.',
+        )
+        parser.add_argument('--format', choices=FORMATS, default='csv')
+        parser.add_argument('--gzip', action='store_true')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Rows fetched from database at once.',
+        )
+        parser.add_argument(
+            '--since',
+            help='Only users, reviews and comments created from this '
+                 'ISO datetime; other tables are exported in full.',
+        )
+
+    def handle(self, *args, **kwargs):
+        """Export files."""
+        since = parse_since(kwargs['since']) if kwargs['since'] else None
+        watermark = timezone.now()
+        os.makedirs(kwargs['path'], exist_ok=True)
+        for model, file_name in DICT.items():
+            self.export(model, file_name, kwargs['path'], kwargs['format'],
+                        kwargs['gzip'], kwargs['chunk_size'], since)
+        self.stdout.write(
+            f'Данные выгружены. Следующая выгрузка: '
+            f'--since {watermark.isoformat()}'
+        )
+
+    def export(self, model, file_name, path, file_format, compress,
+               chunk_size, since):
+        """Export one model reporting speed."""
+        name = f'{os.path.splitext(file_name)[0]}.{file_format}'
+        if compress:
+            name += '.gz'
+        opener = gzip.open if compress else open
+        fields, columns = export_columns(model)
+        started = time.monotonic()
+        with opener(os.path.join(path, name), 'wt', newline='',
+                    encoding='utf8') as file:
+            count = WRITERS[file_format](
+                file, columns, export_rows(model, fields, since, chunk_size)
+            )
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f'{model.__name__}: {count} строк, {count / elapsed:.0f} строк/с'
+        )
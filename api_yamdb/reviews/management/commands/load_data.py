@@ -1,34 +1,227 @@
 """Import files."""
 
 import csv
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import nullcontext
+from itertools import islice
 
+import django
+from django.apps import apps
 from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from reviews.management.commands.rebuild_ratings import rebuild_ratings
 from reviews.models import Category, Comment, Genre, Review, Title, User
 
 CSV_PATH = 'static/data/'
 
 FOREIGN_KEY_FIELDS = ('category', 'author')
 
+DEFAULT_BATCH_SIZE = 1000
+
+TitleGenre = Title.genre.through
+
 DICT = {
     User: 'users.csv',
     Genre: 'genre.csv',
     Category: 'category.csv',
     Title: 'titles.csv',
+    TitleGenre: 'genre_title.csv',
     Review: 'review.csv',
     Comment: 'comments.csv'
 }
 
+# Link tables: repeated title/genre pairs are ignored in every mode.
+LINK_MODELS = (TitleGenre,)
+
+MODES = ('insert', 'skip', 'update')
+
+BATCH_SIZES = {
+    TitleGenre: 10000,
+    Review: 5000,
+    Comment: 5000,
+}
+
+# Lock shared by worker processes. SQLite fails a write that races another
+# writer without waiting for the busy timeout, so batch writes take turns.
+_write_lock = None
+
 
-def csv_serializer(csv_data, model):
-    """CSV load."""
-    objs = []
+def csv_rows(csv_data, model):
+    """CSV rows as unsaved model instances."""
     for row in csv_data:
         for field in FOREIGN_KEY_FIELDS:
             if field in row:
-                row[f'{field}_id'] = row[field]
+                row[f'{field}_id'] = row[field] or None
                 del row[field]
-        objs.append(model(**row))
-    model.objects.bulk_create(objs)
+        yield model(**row)
+
+
+def batches(objs, batch_size):
+    """Split iterable into lists of batch_size."""
+    objs = iter(objs)
+    while True:
+        batch = list(islice(objs, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def csv_fields(model, header):
+    """Attribute names set from CSV columns, without primary key."""
+    fields = []
+    for name in header:
+        if name in FOREIGN_KEY_FIELDS:
+            name = f'{name}_id'
+        if name != model._meta.pk.attname:
+            fields.append(name)
+    return fields
+
+
+def save_batch(model, batch, mode='insert', fields=()):
+    """Save batch of instances.
+
+    ``insert`` fails on existing primary keys, ``skip`` keeps existing rows
+    and ``update`` overwrites ``fields`` of them with loaded values. Only
+    primary keys are matched: rows violating other unique constraints, such
+    as a taken username, fail in every mode.
+    """
+    if mode == 'insert' or model in LINK_MODELS:
+        model.objects.bulk_create(batch, ignore_conflicts=model in LINK_MODELS)
+        return
+    pk_field = model._meta.pk
+    existing = set(model.objects.filter(
+        pk__in=[obj.pk for obj in batch]
+    ).values_list('pk', flat=True))
+    new_objs, old_objs = [], []
+    for obj in batch:
+        if pk_field.to_python(obj.pk) in existing:
+            old_objs.append(obj)
+        else:
+            new_objs.append(obj)
+    model.objects.bulk_create(new_objs)
+    if mode == 'update' and old_objs and fields:
+        model.objects.bulk_update(old_objs, fields)
+
+
+def csv_serializer(csv_data, model, batch_size=DEFAULT_BATCH_SIZE,
+                   mode='insert', fields=()):
+    """CSV load, each batch committed separately.
+
+    Yields number of rows in every committed batch.
+    """
+    for batch in batches(csv_rows(csv_data, model), batch_size):
+        with _write_lock or nullcontext(), transaction.atomic():
+            save_batch(model, batch, mode, fields)
+        yield len(batch)
+
+
+def read_checkpoint(checkpoint):
+    """Committed rows and completion of file import."""
+    try:
+        with open(checkpoint, encoding='utf8') as checkpoint_file:
+            return json.load(checkpoint_file)
+    except FileNotFoundError:
+        return {'rows': 0, 'done': False}
+
+
+def write_checkpoint(checkpoint, rows, done=False):
+    """Replace checkpoint atomically."""
+    tmp_path = f'{checkpoint}.tmp'
+    with open(tmp_path, 'w', encoding='utf8') as checkpoint_file:
+        json.dump({'rows': rows, 'done': done}, checkpoint_file)
+    os.replace(tmp_path, checkpoint)
+
+
+def load_csv(model, path, batch_size, mode='insert', checkpoint=None,
+             resume=False):
+    """Load CSV file, yields number of rows in every committed batch.
+
+    Rows committed according to checkpoint are skipped on resume.
+    """
+    state = {'rows': 0, 'done': False}
+    if checkpoint and resume:
+        state = read_checkpoint(checkpoint)
+    if state['done']:
+        return
+    total = state['rows']
+    with open(path, newline='', encoding='utf8') as csv_file:
+        reader = csv.DictReader(csv_file)
+        fields = csv_fields(model, reader.fieldnames or ())
+        csv_data = islice(reader, total, None)
+        for count in csv_serializer(csv_data, model, batch_size, mode,
+                                    fields):
+            total += count
+            if checkpoint:
+                write_checkpoint(checkpoint, total)
+            yield count
+    if checkpoint:
+        write_checkpoint(checkpoint, total, done=True)
+
+
+def dependencies(model):
+    """Loaded models referenced by model foreign keys."""
+    return {
+        field.related_model for field in model._meta.concrete_fields
+        if field.is_relation
+        and field.related_model in DICT
+        and field.related_model is not model
+    }
+
+
+def init_worker(write_lock=None):
+    """Prepare import worker process."""
+    global _write_lock
+    if not apps.ready:
+        django.setup()
+    connections.close_all()
+    _write_lock = write_lock
+
+
+def load_file(model_label, **options):
+    """Load one CSV file in worker process.
+
+    Returns model label, number of rows loaded and seconds spent.
+    """
+    model = apps.get_model(model_label)
+    started = time.monotonic()
+    total = sum(load_csv(model, **options))
+    connections.close_all()
+    return model_label, total, time.monotonic() - started
+
+
+def parse_batch_sizes(values):
+    """Batch sizes from ``N`` and ``model=N`` option values.
+
+    ``N`` replaces the default and the built-in sizes, ``model=N`` given in
+    any order takes precedence over it.
+    """
+    models = {model._meta.model_name: model for model in DICT}
+    default = DEFAULT_BATCH_SIZE
+    built_in = dict(BATCH_SIZES)
+    sizes = {}
+    for value in values or ():
+        name, _, size = value.rpartition('=')
+        try:
+            size = int(size)
+        except ValueError:
+            raise CommandError(f'Неверный размер пакета: {value}')
+        if size < 1:
+            raise CommandError(f'Неверный размер пакета: {value}')
+        if not name:
+            default = size
+            built_in = {}
+        elif name.lower() in models:
+            sizes[models[name.lower()]] = size
+        else:
+            raise CommandError(f'Неизвестная модель: {name}')
+    return {
+        model: sizes.get(model, built_in.get(model, default))
+        for model in DICT
+    }
 
 
 class Command(BaseCommand):
@@ -36,14 +229,118 @@ class Command(BaseCommand):
 
     help = 'Load data from csv file into the database'
 
+    def add_arguments(self, parser):
+        """Command options."""
+        parser.add_argument(
+            '--batch-size',
+            action='append',
+            metavar='[MODEL=]N',
+            help='Rows per committed batch, for all or one model.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Worker processes loading independent files in parallel.',
+        )
+        parser.add_argument(
+            '--path',
+            default=CSV_PATH,
+            help='Directory with CSV files.',
+        )
+        parser.add_argument(
+            '--mode',
+            choices=MODES,
+            default='insert',
+            help='Rows with existing primary keys: fail, skip or update.',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue after the last committed batch of every file.',
+        )
+        parser.add_argument(
+            '--checkpoint-dir',
+            help='Directory for checkpoints, CSV directory by default.',
+        )
+
     def handle(self, *args, **kwargs):
         """Load files."""
-        for model, file_name in DICT.items():
-            try:
-                with open(CSV_PATH + file_name,
-                          newline='', encoding='utf8') as csv_file:
-                    csv_data = csv.DictReader(csv_file)
-                    csv_serializer(csv_data, model)
-            except Exception as e:
-                raise CommandError(e)
-            print('Данные успешно заргружены.')
+        batch_sizes = parse_batch_sizes(kwargs['batch_size'])
+        mode = kwargs['mode']
+        if kwargs['resume'] and mode == 'insert':
+            # The batch committed right before an interruption may be
+            # missing from checkpoint, so it is replayed as skip.
+            mode = 'skip'
+        checkpoint_dir = kwargs['checkpoint_dir'] or kwargs['path']
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        tasks = {
+            model: {
+                'path': os.path.join(kwargs['path'], file_name),
+                'batch_size': batch_sizes[model],
+                'mode': mode,
+                'checkpoint': os.path.join(checkpoint_dir,
+                                           f'{file_name}.checkpoint'),
+                'resume': kwargs['resume'],
+            }
+            for model, file_name in DICT.items()
+        }
+        if kwargs['workers'] > 1:
+            self.load_parallel(tasks, kwargs['workers'])
+        else:
+            for model, options in tasks.items():
+                try:
+                    self.load(model, **options)
+                except Exception as e:
+                    raise CommandError(e)
+                self.stdout.write('Данные успешно заргружены.')
+        rebuild_ratings()
+
+    def load_parallel(self, tasks, workers):
+        """Load files in worker processes in foreign key order.
+
+        A file is started as soon as files of all models it references are
+        loaded, so independent files are read concurrently. On SQLite the
+        batch writes of workers are serialized.
+        """
+        pending = dict(tasks)
+        loaded = set()
+        running = {}
+        write_lock = None
+        if connection.vendor == 'sqlite':
+            write_lock = multiprocessing.Lock()
+        connections.close_all()
+        with ProcessPoolExecutor(workers, initializer=init_worker,
+                                 initargs=(write_lock,)) as pool:
+            while pending or running:
+                for model, options in list(pending.items()):
+                    if dependencies(model) <= loaded:
+                        future = pool.submit(load_file, model._meta.label,
+                                             **options)
+                        running[future] = model
+                        del pending[model]
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    model = running.pop(future)
+                    try:
+                        _, total, elapsed = future.result()
+                    except Exception as e:
+                        raise CommandError(e)
+                    loaded.add(model)
+                    self.stdout.write(
+                        f'{model.__name__}: {total} строк, '
+                        f'{total / max(elapsed, 1e-6):.0f} строк/с'
+                    )
+        self.stdout.write('Данные успешно заргружены.')
+
+    def load(self, model, **options):
+        """Load one file reporting progress."""
+        started = time.monotonic()
+        total = 0
+        for count in load_csv(model, **options):
+            total += count
+            elapsed = max(time.monotonic() - started, 1e-6)
+            self.stdout.write(
+                f'{model.__name__}: {total} строк, '
+                f'{total / elapsed:.0f} строк/с'
+            )
@@ -0,0 +1,40 @@
+"""Rebuild title ratings."""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import (Avg, Count, FloatField, IntegerField, OuterRef,
+                              Subquery, Sum, Value)
+from django.db.models.functions import Coalesce
+from reviews.models import Review, Title
+
+
+def rebuild_ratings():
+    """Recompute rating aggregates of every title from its reviews."""
+    reviews = Review.objects.filter(title=OuterRef("pk")).order_by()
+    reviews = reviews.values("title")
+    with transaction.atomic():
+        return Title.objects.update(
+            rating_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum("score"))
+                         .values("total"), output_field=IntegerField()),
+                Value(0),
+            ),
+            rating_count=Coalesce(
+                Subquery(reviews.annotate(total=Count("pk"))
+                         .values("total"), output_field=IntegerField()),
+                Value(0),
+            ),
+            rating=Subquery(reviews.annotate(avg=Avg("score"))
+                            .values("avg"), output_field=FloatField()),
+        )
+
+
+class Command(BaseCommand):
+    """Класс выполнения."""
+
+    help = 'Rebuild stored rating aggregates of all titles from reviews'
+
+    def handle(self, *args, **kwargs):
+        """Rebuild ratings."""
+        updated = rebuild_ratings()
+        print(f'Рейтинги пересчитаны: {updated}.')
@@ -0,0 +1,49 @@
+# Generated by Django 3.2 on 2026-10-18 10:00
+
+from django.db import migrations, models
+from django.db.models import (Avg, Count, FloatField, IntegerField, OuterRef,
+                              Subquery, Sum)
+
+
+def fill_ratings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    db_alias = schema_editor.connection.alias
+    reviews = Review.objects.using(db_alias).order_by()
+    per_title = reviews.filter(title=OuterRef('pk')).values('title')
+    Title.objects.using(db_alias).filter(
+        pk__in=reviews.values('title_id')
+    ).update(
+        rating_sum=Subquery(per_title.annotate(total=Sum('score'))
+                            .values('total'), output_field=IntegerField()),
+        rating_count=Subquery(per_title.annotate(total=Count('pk'))
+                              .values('total'), output_field=IntegerField()),
+        rating=Subquery(per_title.annotate(avg=Avg('score'))
+                        .values('avg'), output_field=FloatField()),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_auto_20230510_1638'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.2 on 2026-10-18 13:00
+
+from api.search import get_search_backend
+from django.db import migrations
+
+
+def setup_search(apps, schema_editor):
+    connection = schema_editor.connection
+    get_search_backend(connection.alias).setup(connection)
+
+
+def teardown_search(apps, schema_editor):
+    connection = schema_editor.connection
+    get_search_backend(connection.alias).teardown(connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_pub_date_default'),
+    ]
+
+    operations = [
+        migrations.RunPython(setup_search, teardown_search),
+    ]
@@ -1,8 +1,14 @@
 """Models."""
 
+import threading
+from contextlib import contextmanager
+
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Cast, Greatest
+from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -55,6 +61,13 @@ class User(AbstractUser):
         """User self."""
         return self.username
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember stored username to notice renames on save."""
+        instance = super().from_db(db, field_names, values)
+        instance._stored_username = instance.__dict__.get("username")
+        return instance
+
 
 class BaseCategory(models.Model):
     """Базовая модель для категории и жанра"""
@@ -90,6 +103,36 @@ class Genre(BaseCategory):
         ordering = ["name"]
 
 
+_deleting = threading.local()
+
+
+def titles_being_deleted():
+    """Ids of titles deleted by the running delete in this thread."""
+    if not hasattr(_deleting, "title_ids"):
+        _deleting.title_ids = set()
+    return _deleting.title_ids
+
+
+@contextmanager
+def deleting_titles():
+    """Forget titles marked for deletion in the block, even if it fails."""
+    title_ids = titles_being_deleted()
+    marked_before = set(title_ids)
+    try:
+        yield
+    finally:
+        title_ids.intersection_update(marked_before)
+
+
+class TitleQuerySet(models.QuerySet):
+    """Title queryset."""
+
+    def delete(self):
+        """Delete titles, forgetting them afterwards."""
+        with deleting_titles():
+            return super().delete()
+
+
 class Title(models.Model):
     """Модель произведений."""
 
@@ -115,16 +158,64 @@ class Title(models.Model):
         null=True,
         verbose_name="Категория",
     )
+    rating_sum = models.PositiveIntegerField(
+        verbose_name="Сумма оценок",
+        default=0,
+        editable=False,
+    )
+    rating_count = models.PositiveIntegerField(
+        verbose_name="Количество оценок",
+        default=0,
+        editable=False,
+    )
+    rating = models.FloatField(
+        verbose_name="Рейтинг",
+        blank=True,
+        null=True,
+        editable=False,
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         """Meta title."""
 
         ordering = ["-year"]
+        indexes = [
+            models.Index(fields=["name"], name="title_name_idx"),
+            models.Index(fields=["year", "name"],
+                         name="title_year_name_idx"),
+        ]
 
     def __str__(self):
         """Self. title."""
         return self.name
 
+    def delete(self, *args, **kwargs):
+        """Delete title, forgetting it afterwards."""
+        with deleting_titles():
+            return super().delete(*args, **kwargs)
+
+    @classmethod
+    def shift_rating(cls, title_id, score_delta, count_delta):
+        """Shift stored rating aggregates in a single UPDATE.
+
+        Aggregates stop at zero, so drift left by bulk inserts is corrected
+        by ``rebuild_ratings`` instead of failing deletes.
+        """
+        new_sum = Greatest(F("rating_sum") + score_delta, Value(0))
+        new_count = Greatest(F("rating_count") + count_delta, Value(0))
+        cls.objects.filter(pk=title_id).update(
+            rating_sum=new_sum,
+            rating_count=new_count,
+            rating=Case(
+                When(rating_count__lte=-count_delta, then=None),
+                default=(Cast(new_sum, FloatField())
+                         / Cast(new_count, FloatField())),
+                output_field=FloatField(),
+            ),
+        )
+
 
 class Review(models.Model):
     """Модель отзывов."""
@@ -147,7 +238,9 @@ class Review(models.Model):
         verbose_name="Оценка",
         validators=[MinValueValidator(1), MaxValueValidator(10)],
     )
-    pub_date = models.DateTimeField("Дата публикации", auto_now_add=True)
+    pub_date = models.DateTimeField(
+        "Дата публикации", default=timezone.now, editable=False
+    )
 
     class Meta:
         """Review Meta."""
@@ -157,11 +250,46 @@ class Review(models.Model):
             models.UniqueConstraint(fields=["author", "title"],
                                     name="unique_review")
         ]
+        indexes = [
+            models.Index(fields=["title", "pub_date"],
+                         name="review_title_pub_date_idx"),
+        ]
 
     def __str__(self):
         """Self review."""
         return self.text[:50]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember stored score to compute rating deltas on save."""
+        instance = super().from_db(db, field_names, values)
+        instance._remember_rating_state()
+        return instance
+
+    def _remember_rating_state(self):
+        """Store current title and score as the persisted state."""
+        self._stored_rating = (self.__dict__.get("title_id"),
+                               self.__dict__.get("score"))
+
+    def save(self, *args, **kwargs):
+        """Save review and update title rating in one transaction."""
+        adding = self._state.adding
+        with transaction.atomic(using=kwargs.get("using")):
+            stored = getattr(self, "_stored_rating", (None, None))
+            if not adding and None in stored:
+                stored = Review.objects.filter(pk=self.pk).values_list(
+                    "title_id", "score").first() or (None, None)
+            super().save(*args, **kwargs)
+            old_title_id, old_score = stored
+            if old_title_id is None:
+                Title.shift_rating(self.title_id, self.score, 1)
+            elif old_title_id != self.title_id:
+                Title.shift_rating(old_title_id, -old_score, -1)
+                Title.shift_rating(self.title_id, self.score, 1)
+            elif old_score != self.score:
+                Title.shift_rating(self.title_id, self.score - old_score, 0)
+        self._remember_rating_state()
+
 
 class Comment(models.Model):
     """Модель комментариев."""
@@ -172,12 +300,18 @@ class Comment(models.Model):
     text = models.TextField("Текст")
     author = models.ForeignKey(User, on_delete=models.CASCADE,
                                related_name="comments")
-    pub_date = models.DateTimeField("Дата публикации", auto_now_add=True)
+    pub_date = models.DateTimeField(
+        "Дата публикации", default=timezone.now, editable=False
+    )
 
     class Meta:
         """Comment Meta."""
 
         ordering = ["pub_date"]
+        indexes = [
+            models.Index(fields=["review", "pub_date"],
+                         name="comment_review_pub_date_idx"),
+        ]
 
     def __str__(self):
         """Self comment."""
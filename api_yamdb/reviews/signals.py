@@ -0,0 +1,31 @@
+"""Model signals."""
+
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
+
+from reviews.models import Review, Title, titles_being_deleted
+
+
+@receiver(pre_delete, sender=Title)
+def title_deleting(sender, instance, **kwargs):
+    """Mark title whose reviews are deleted along with it.
+
+    ``Title.delete`` and ``TitleQuerySet.delete`` forget the mark once the
+    delete finishes or fails.
+    """
+    titles_being_deleted().add(instance.pk)
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    """Subtract deleted review from title rating.
+
+    Runs inside the delete transaction, also for cascades and bulk deletes.
+    Reviews deleted together with their title leave nothing to update.
+    """
+    title_id, score = getattr(instance, "_stored_rating", (None, None))
+    if title_id is None or score is None:
+        title_id, score = instance.title_id, instance.score
+    if title_id in titles_being_deleted():
+        return
+    Title.shift_rating(title_id, -score, -1)
@@ -0,0 +1,182 @@
+"""Requests per second and latency of the API under WSGI and ASGI.
+
+Serves a scratch SQLite catalog with gunicorn (threaded workers) and with
+uvicorn (async title, review and comment views), then fetches title,
+review and comment pages from concurrent keep-alive connections.
+A server that is not installed is skipped.
+
+Usage: python benchmarks/asgi_wsgi.py [--workers N] [--threads N]
+       [--concurrency N] [--duration SECONDS] [--rows N]
+"""
+
+import argparse
+import http.client
+import importlib.util
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.utils import (PROJECT_DIR, ROOT_DIR, fill_database,  # noqa
+                              setup_django)
+
+
+SERVERS = {
+    'wsgi, gunicorn': 'gunicorn',
+    'asgi, uvicorn': 'uvicorn',
+}
+
+
+def server_command(module, port, options):
+    """Command serving the project with server module on port."""
+    if module == 'gunicorn':
+        return [
+            sys.executable, '-m', 'gunicorn', 'api_yamdb.wsgi:application',
+            '--workers', str(options.workers),
+            '--threads', str(options.threads),
+            '--bind', f'127.0.0.1:{port}', '--log-level', 'warning',
+        ]
+    return [
+        sys.executable, '-m', 'uvicorn', 'api_yamdb.asgi:application',
+        '--workers', str(options.workers), '--host', '127.0.0.1',
+        '--port', str(port), '--log-level', 'warning', '--no-access-log',
+    ]
+
+
+def free_port():
+    """Unused local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def paths(rows, count=1000):
+    """Random title, review and comment pages of fill_database catalog."""
+    titles = max(rows // 100, 1)
+    result = []
+    for _ in range(count):
+        review = random.randrange(rows)
+        title = review % titles + 1
+        result.append(random.choice((
+            f'/api/v1/titles/?offset={random.randrange(titles)}',
+            f'/api/v1/titles/{title}/',
+            f'/api/v1/titles/{title}/reviews/',
+            f'/api/v1/titles/{title}/reviews/{review + 1}/comments/',
+        )))
+    return result
+
+
+def wait_until_ready(port, process, timeout=30):
+    """Wait for server to answer, fail if it exits."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('сервер завершился при запуске')
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port,
+                                                    timeout=1)
+            connection.request('GET', '/api/v1/categories/')
+            connection.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('сервер не ответил')
+
+
+def load(port, urls, concurrency, duration):
+    """Latencies of successful requests and error count."""
+    latencies = []
+    errors = []
+    stop_at = time.monotonic() + duration
+
+    def client():
+        connection = http.client.HTTPConnection('127.0.0.1', port,
+                                                timeout=30)
+        own, failed = [], 0
+        while time.monotonic() < stop_at:
+            started = time.monotonic()
+            try:
+                connection.request('GET', random.choice(urls))
+                response = connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                failed += 1
+                continue
+            if response.status < 300:
+                own.append(time.monotonic() - started)
+            else:
+                failed += 1
+        latencies.extend(own)
+        errors.append(failed)
+
+    workers = [threading.Thread(target=client) for _ in range(concurrency)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return latencies, sum(errors)
+
+
+def run(name, module, db_name, urls, options):
+    """Print throughput and latency of server."""
+    port = free_port()
+    env = {
+        **os.environ,
+        'BENCH_DB_NAME': db_name,
+        'DJANGO_SETTINGS_MODULE': 'benchmarks.settings',
+        'PYTHONPATH': os.pathsep.join((ROOT_DIR, PROJECT_DIR)),
+        'ASYNC_EXECUTOR_WORKERS': str(options.threads),
+    }
+    process = subprocess.Popen(server_command(module, port, options),
+                               cwd=PROJECT_DIR, env=env)
+    try:
+        wait_until_ready(port, process)
+        load(port, urls, options.concurrency, 1)
+        latencies, errors = load(port, urls, options.concurrency,
+                                 options.duration)
+    finally:
+        process.terminate()
+        process.wait()
+    if len(latencies) < 2:
+        print(f'{name}: нет успешных запросов, ошибок: {errors}')
+        return
+    p50 = statistics.median(latencies) * 1000
+    p99 = statistics.quantiles(latencies, n=100)[98] * 1000
+    print(f'{name}: {len(latencies) / options.duration:.0f} запросов/с, '
+          f'p50 {p50:.1f} мс, p99 {p99:.1f} мс, ошибок: {errors}')
+
+
+def main():
+    """Run benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--rows', type=int, default=20000)
+    options = parser.parse_args()
+
+    print(f'{options.workers} workers x {options.threads} threads, '
+          f'{options.concurrency} connections, {options.duration:g} s')
+    with tempfile.TemporaryDirectory() as tmp:
+        db_name = os.path.join(tmp, 'bench.sqlite3')
+        setup_django(db_name)
+        fill_database(options.rows)
+        urls = paths(options.rows)
+        for name, module in SERVERS.items():
+            if importlib.util.find_spec(module) is None:
+                print(f'{name}: пропущено, установите {module}')
+                continue
+            run(name, module, db_name, urls, options)
+
+
+if __name__ == '__main__':
+    main()
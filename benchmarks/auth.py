@@ -0,0 +1,75 @@
+"""Cost of authorizing an admin write of a JWT-authenticated request.
+
+Usage: python benchmarks/auth.py [--requests N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.utils import setup_django  # noqa: E402
+
+MODES = (
+    ('database', 'rest_framework_simplejwt.authentication.JWTAuthentication',
+     False),
+    ('cached', 'api.authentication.CachedJWTAuthentication', False),
+    ('stateless', 'api.authentication.CachedJWTAuthentication', True),
+    ('claims', 'api.authentication.CachedJWTAuthentication', False),
+)
+
+
+def authorize(authenticator, request, mode):
+    """Admin check from user or, in claims mode, from token alone."""
+    from api.authentication import get_user_cache, token_claims
+
+    user, token = authenticator.authenticate(request)
+    if mode == 'claims':
+        # Cold user cache: claims must not need it.
+        get_user_cache().clear()
+        return token_claims(token)['role'] == 'admin'
+    return user.is_admin
+
+
+def main():
+    """Run benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=10000)
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(os.path.join(tmp, 'bench.sqlite3'))
+        from api.authentication import RoleAccessToken
+        from django.conf import settings
+        from django.db import connection
+        from django.test import RequestFactory
+        from django.test.utils import CaptureQueriesContext, override_settings
+        from django.utils.module_loading import import_string
+        from reviews.models import User
+
+        admin = User.objects.create_user('bench-admin', 'admin@yamdb.fake',
+                                         role='admin')
+        request = RequestFactory().get(
+            '/', HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(admin)}'
+        )
+        for mode, authentication, stateless in MODES:
+            authenticator = import_string(authentication)()
+            with override_settings(AUTH_USER_CACHE={
+                **settings.AUTH_USER_CACHE, 'STATELESS': stateless
+            }):
+                authorize(authenticator, request, mode)
+                with CaptureQueriesContext(connection) as context:
+                    authorize(authenticator, request, mode)
+                started = time.perf_counter()
+                for _ in range(options.requests):
+                    authorize(authenticator, request, mode)
+                elapsed = time.perf_counter() - started
+            print(f'{mode}: {elapsed / options.requests * 1e6:.1f} us, '
+                  f'{len(context.captured_queries)} queries')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Write throughput of single and bulk title and review requests.
+
+Usage: python benchmarks/bulk_write.py [--items N] [--batch-size N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.utils import setup_django  # noqa: E402
+
+
+def authorization(user):
+    """Authorization header with JWT of user."""
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    return f'Bearer {RefreshToken.for_user(user).access_token}'
+
+
+def report(name, count, started):
+    """Print rows per second."""
+    elapsed = max(time.perf_counter() - started, 1e-6)
+    print(f'{name}: {count} строк, {count / elapsed:.0f} строк/с')
+
+
+def titles(start, count):
+    """Title payloads."""
+    return [
+        {'name': f'Произведение {idx}', 'year': 2000, 'category': 'movie',
+         'genre': ['drama', 'comedy'], 'description': 'Описание'}
+        for idx in range(start, start + count)
+    ]
+
+
+def main():
+    """Run benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--items', type=int, default=2000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    options = parser.parse_args()
+    items, batch_size = options.items, options.batch_size
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(os.path.join(tmp, 'bench.sqlite3'))
+        from reviews.models import Category, Genre, Review, Title, User
+
+        from rest_framework.test import APIClient
+
+        admin = User.objects.create_user('bench-admin', 'admin@yamdb.fake',
+                                         role='admin')
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=authorization(admin))
+        Category.objects.create(name='Фильм', slug='movie')
+        Genre.objects.bulk_create([Genre(name='Драма', slug='drama'),
+                                   Genre(name='Комедия', slug='comedy')])
+        User.objects.bulk_create(
+            User(username=f'user{idx}', email=f'user{idx}@yamdb.fake')
+            for idx in range(2 * items)
+        )
+        tokens = [authorization(user) for user in
+                  User.objects.filter(username__startswith='user')[:items]]
+
+        started = time.perf_counter()
+        for data in titles(0, items):
+            client.post('/api/v1/titles/', data=data, format='json')
+        report('titles, single', items, started)
+
+        started = time.perf_counter()
+        for start in range(items, 2 * items, batch_size):
+            client.post('/api/v1/titles/bulk/',
+                        data=titles(start, batch_size), format='json')
+        report('titles, bulk', items, started)
+
+        url = '/api/v1/titles/1/reviews/'
+        started = time.perf_counter()
+        for token in tokens:
+            APIClient().post(url, HTTP_AUTHORIZATION=token, format='json',
+                             data={'text': 'Текст', 'score': 5})
+        report('reviews, single', items, started)
+
+        url = '/api/v1/titles/2/reviews/bulk/'
+        started = time.perf_counter()
+        for start in range(items, 2 * items, batch_size):
+            client.post(url, format='json', data=[
+                {'author': f'user{idx}', 'text': 'Текст', 'score': 5}
+                for idx in range(start, start + batch_size)
+            ])
+        report('reviews, bulk', items, started)
+        print(f'{Title.objects.count()} titles, '
+              f'{Review.objects.count()} reviews saved')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""Throughput of concurrent API workers on SQLite and PostgreSQL.
+
+Every worker process posts reviews and comments and reads comment lists,
+like a gunicorn worker. SQLite runs with rollback journal and with WAL;
+PostgreSQL runs when DB_ENGINE and DB_* point to a disposable database.
+
+Usage: python benchmarks/concurrency.py [--workers N] [--requests N]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.utils import setup_django  # noqa: E402
+
+SQLITE = 'django.db.backends.sqlite3'
+
+MODES = {
+    'sqlite, rollback journal': {
+        'DB_ENGINE': SQLITE,
+        'DB_SQLITE_JOURNAL_MODE': 'delete',
+        'DB_SQLITE_SYNCHRONOUS': 'full',
+    },
+    'sqlite, wal': {
+        'DB_ENGINE': SQLITE,
+        'DB_SQLITE_JOURNAL_MODE': 'wal',
+        'DB_SQLITE_SYNCHRONOUS': 'normal',
+    },
+}
+
+_worker = {}
+
+
+def init_worker(env, barrier, migrate=False):
+    """Configure Django for mode environment."""
+    os.environ.update(env)
+    setup_django(env['BENCH_DB_NAME'], migrate=migrate)
+    _worker['barrier'] = barrier
+
+
+def prepare(workers, requests):
+    """Fresh tables, a token per worker and titles to review."""
+    from api.authentication import RoleAccessToken
+    from django.core.management import call_command
+    from reviews.models import Review, Title, User
+
+    call_command('flush', interactive=False, verbosity=0)
+    users = [User.objects.create_user(f'user{idx}', f'user{idx}@yamdb.fake')
+             for idx in range(workers)]
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {idx}', year=2000, description='')
+        for idx in range(workers * requests + 1)
+    )
+    title_ids = list(Title.objects.order_by('pk').values_list('pk', flat=True))
+    review = Review.objects.create(title_id=title_ids.pop(), author=users[0],
+                                   text='Отзыв', score=5)
+    comments_url = (f'/api/v1/titles/{review.title_id}/reviews/'
+                    f'{review.pk}/comments/')
+    return [
+        (str(RoleAccessToken.for_user(user)),
+         title_ids[idx * requests:(idx + 1) * requests], comments_url)
+        for idx, user in enumerate(users)
+    ]
+
+
+def work(token, title_ids, comments_url):
+    """Write and read requests; counts and wall-clock interval."""
+    from rest_framework.test import APIClient
+
+    client = APIClient(raise_request_exception=False)
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    ok = failed = 0
+    _worker['barrier'].wait()
+    started = time.time()
+    for title_id in title_ids:
+        for response in (
+            client.post(f'/api/v1/titles/{title_id}/reviews/',
+                        data={'text': 'Текст', 'score': 7}),
+            client.post(comments_url, data={'text': 'Комментарий'}),
+            client.get(comments_url),
+        ):
+            if response.status_code < 300:
+                ok += 1
+            else:
+                failed += 1
+    return ok, failed, started, time.time()
+
+
+def run(name, env, workers, requests):
+    """Print throughput of mode."""
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1, init_worker, (env, None, True)) as pool:
+        tasks = pool.apply(prepare, (workers, requests))
+    barrier = context.Barrier(workers)
+    with context.Pool(workers, init_worker, (env, barrier)) as pool:
+        results = pool.starmap(work, tasks)
+    ok = sum(result[0] for result in results)
+    failed = sum(result[1] for result in results)
+    elapsed = (max(result[3] for result in results)
+               - min(result[2] for result in results))
+    print(f'{name}: {ok / elapsed:.0f} запросов/с, ошибок: {failed}')
+
+
+def main():
+    """Run benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=200)
+    options = parser.parse_args()
+
+    modes = dict(MODES)
+    if os.getenv('DB_ENGINE', SQLITE) != SQLITE:
+        modes['postgresql'] = {'DB_ENGINE': os.environ['DB_ENGINE']}
+    else:
+        print('postgresql: пропущено, задайте DB_ENGINE и DB_*')
+    print(f'{options.workers} workers x {options.requests} x 3 requests')
+    for name, env in modes.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {**env, 'BENCH_DB_NAME': os.path.join(tmp, 'bench.sqlite3')}
+            run(name, env, options.workers, options.requests)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Query plans and timings of API queries with and without indexes.
+
+Usage: python benchmarks/indexes.py [--rows N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.utils import fill_database, setup_django  # noqa: E402
+
+QUERY_INDEXES = (
+    ('Title', 'title_name_idx'),
+    ('Title', 'title_year_name_idx'),
+    ('Review', 'review_title_pub_date_idx'),
+    ('Comment', 'comment_review_pub_date_idx'),
+)
+
+
+def queries():
+    """Querysets issued by the API."""
+    from reviews.models import Comment, Review, Title
+
+    return {
+        'reviews of title by -pub_date': (
+            Review.objects.filter(title_id=7).order_by('-pub_date', '-id')
+        ),
+        'comments of review by pub_date': (
+            Comment.objects.filter(review_id=7).order_by('pub_date', 'id')
+        ),
+        'titles by name': Title.objects.order_by('name', 'id'),
+        'titles of year by name': (
+            Title.objects.filter(year=1984).order_by('name')
+        ),
+    }
+
+
+def measure(label, repeat):
+    """Print plan and average time of every query."""
+    print(f'== {label}')
+    for name, queryset in queries().items():
+        started = time.perf_counter()
+        for _ in range(repeat):
+            list(queryset[:10])
+        elapsed = (time.perf_counter() - started) / repeat * 1000
+        print(f'{name}: {elapsed:.3f} ms')
+        for line in queryset[:10].explain().splitlines():
+            print(f'    {line}')
+
+
+def drop_indexes():
+    """Remove query indexes added to models."""
+    from django.apps import apps
+    from django.db import connection
+
+    with connection.schema_editor() as editor:
+        for model_name, index_name in QUERY_INDEXES:
+            model = apps.get_model('reviews', model_name)
+            index = next(index for index in model._meta.indexes
+                         if index.name == index_name)
+            editor.remove_index(model, index)
+
+
+def main():
+    """Run benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=200)
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(os.path.join(tmp, 'bench.sqlite3'))
+        fill_database(options.rows)
+        print(f'{options.rows} reviews and comments')
+        measure('with indexes', options.repeat)
+        drop_indexes()
+        measure('without indexes', options.repeat)
+
+
+if __name__ == '__main__':
+    main()
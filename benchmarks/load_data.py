@@ -0,0 +1,40 @@
+"""Wall-clock time of load_data with different numbers of workers.
+
+Usage: python benchmarks/load_data.py [--rows N] [--workers 1 2 4]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.utils import create_database, generate_catalog, manage  # noqa
+
+
+def main():
+    """Run benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=[1, 2, 4, os.cpu_count()])
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = os.path.join(tmp, 'data')
+        db_name = os.path.join(tmp, 'bench.sqlite3')
+        generate_catalog(data_path, options.rows)
+        print(f'{options.rows} reviews and comments, cpu: {os.cpu_count()}')
+        baseline = None
+        for workers in sorted(set(options.workers)):
+            create_database(db_name)
+            seconds = manage(db_name, 'load_data', '--path', data_path,
+                             '--workers', str(workers))
+            baseline = baseline or seconds
+            print(f'workers={workers:<3} {seconds:8.2f} s  '
+                  f'x{baseline / seconds:.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Routing of API requests between primary and replica SQLite files.
+
+The replica is a copy of the primary refreshed on demand, so replication
+lag can be observed: a writer reads its own changes from the primary while
+anonymous readers see the replica.
+
+Usage: python benchmarks/replicas.py [--requests N]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.utils import setup_django  # noqa: E402
+
+
+def replicate(primary, replica):
+    """Copy primary database into replica."""
+    with sqlite3.connect(primary) as source, \
+            sqlite3.connect(replica) as target:
+        source.backup(target)
+
+
+def queries(client, method, url, **kwargs):
+    """Response and queries per database alias."""
+    from django.db import connections
+    from django.test.utils import CaptureQueriesContext
+
+    contexts = {alias: CaptureQueriesContext(connections[alias])
+                for alias in ('default', 'replica1')}
+    for context in contexts.values():
+        context.__enter__()
+    response = getattr(client, method)(url, **kwargs)
+    for context in contexts.values():
+        context.__exit__(None, None, None)
+    return response, {alias: len(context.captured_queries)
+                      for alias, context in contexts.items()}
+
+
+def main():
+    """Run benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=500)
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        primary = os.path.join(tmp, 'primary.sqlite3')
+        replica = os.path.join(tmp, 'replica.sqlite3')
+        os.environ['DB_REPLICAS'] = replica
+        setup_django(primary)
+        from api.authentication import RoleAccessToken
+        from django.db import connections
+        from rest_framework.test import APIClient
+        from reviews.models import User
+
+        admin = User.objects.create_user('bench-admin', 'admin@yamdb.fake',
+                                         role='admin')
+        replicate(primary, replica)
+        reader = APIClient()
+        writer = APIClient()
+        writer.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(admin)}'
+        )
+        url = '/api/v1/genres/'
+
+        response, counts = queries(writer, 'post', url,
+                                   data={'name': 'Драма', 'slug': 'drama'})
+        print(f'writer POST: {counts}')
+        response, counts = queries(writer, 'get', url)
+        print(f'writer GET: {counts}, жанров: {response.json()["count"]}')
+        response, counts = queries(reader, 'get', url, data={'search': 'Др'})
+        print(f'reader GET before replication: {counts}, '
+              f'жанров: {response.json()["count"]}')
+        connections.close_all()
+        replicate(primary, replica)
+        response, counts = queries(reader, 'get', url, data={'search': 'Дра'})
+        print(f'reader GET after replication: {counts}, '
+              f'жанров: {response.json()["count"]}')
+
+        started = time.perf_counter()
+        for idx in range(options.requests):
+            reader.get('/api/v1/titles/', {'year': idx})
+        elapsed = time.perf_counter() - started
+        print(f'reader GET: {options.requests / elapsed:.0f} запросов/с')
+
+
+if __name__ == '__main__':
+    main()
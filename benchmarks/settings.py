@@ -0,0 +1,15 @@
+"""Benchmark settings, project settings with a scratch database.
+
+SQLite databases are created at BENCH_DB_NAME; other engines use the
+database configured by DB_* variables, which must be disposable.
+"""
+
+import os
+
+from api_yamdb.settings import *  # noqa: F401,F403
+from api_yamdb.settings import DATABASES, DB_ENGINE
+
+if DB_ENGINE == 'django.db.backends.sqlite3':
+    DATABASES['default']['NAME'] = os.environ['BENCH_DB_NAME']
+
+DEBUG = False
@@ -0,0 +1,60 @@
+"""Title filtering by category and genre slugs, substring vs exact mode.
+
+Usage: python benchmarks/slug_filter.py [--rows N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.utils import fill_database, setup_django  # noqa: E402
+
+FILTERS = {
+    'category': {'category': 'category3'},
+    'genre': {'genre': 'genre7'},
+    'genres': {'genre': 'genre7,genre11'},
+}
+
+
+def measure(slug_match, repeat):
+    """Print plan and average time of page and count queries."""
+    from api.filters import TitlesFilter
+    from reviews.models import Title
+
+    print(f'== slug_match={slug_match}')
+    for name, data in FILTERS.items():
+        data = {**data, 'slug_match': slug_match}
+        started = time.perf_counter()
+        for _ in range(repeat):
+            queryset = TitlesFilter(
+                data, queryset=Title.objects.order_by('name', 'id')
+            ).qs
+            list(queryset[:10])
+            queryset.count()
+        elapsed = (time.perf_counter() - started) / repeat * 1000
+        print(f'{name}: {elapsed:.3f} ms, {queryset.count()} titles')
+        for line in queryset[:10].explain().splitlines():
+            print(f'    {line}')
+
+
+def main():
+    """Run benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=50)
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(os.path.join(tmp, 'bench.sqlite3'))
+        fill_database(options.rows)
+        print(f'{max(options.rows // 100, 1)} titles')
+        measure('contains', options.repeat)
+        measure('exact', options.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""Benchmark helpers."""
+
+import csv
+import os
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_DIR = os.path.join(ROOT_DIR, 'api_yamdb')
+
+
+def setup_django(db_name, migrate=True):
+    """Configure Django in this process on scratch database."""
+    if PROJECT_DIR not in sys.path:
+        sys.path.insert(0, PROJECT_DIR)
+    os.environ['BENCH_DB_NAME'] = db_name
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.settings'
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    if migrate:
+        call_command('migrate', run_syncdb=True, verbosity=0)
+
+
+def manage(db_name, *args, env=None):
+    """Run manage.py command on scratch database, return seconds spent."""
+    environ = {
+        **os.environ,
+        'BENCH_DB_NAME': db_name,
+        'DJANGO_SETTINGS_MODULE': 'benchmarks.settings',
+        'PYTHONPATH': os.pathsep.join((ROOT_DIR, PROJECT_DIR)),
+        **(env or {}),
+    }
+    started = time.monotonic()
+    subprocess.run(
+        [sys.executable, os.path.join(PROJECT_DIR, 'manage.py'), *args],
+        check=True, env=environ, cwd=PROJECT_DIR,
+        stdout=subprocess.DEVNULL,
+    )
+    return time.monotonic() - started
+
+
+def create_database(db_name):
+    """Fresh scratch database with project tables."""
+    if os.path.exists(db_name):
+        os.remove(db_name)
+    manage(db_name, 'migrate', '--run-syncdb', '-v', '0')
+
+
+def write_csv(path, header, rows):
+    """Write CSV file."""
+    with open(path, 'w', newline='', encoding='utf8') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def generate_catalog(path, rows):
+    """CSV files in load_data format with ``rows`` reviews and comments."""
+    os.makedirs(path, exist_ok=True)
+    users = titles = max(rows // 10, 1)
+    date = '2020-01-01T00:00:00Z'
+    write_csv(
+        os.path.join(path, 'users.csv'),
+        ('id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'),
+        ((idx, f'user{idx}', f'user{idx}@yamdb.fake', 'user', '', '', '')
+         for idx in range(1, users + 1)),
+    )
+    write_csv(
+        os.path.join(path, 'genre.csv'), ('id', 'name', 'slug'),
+        ((idx, f'Жанр {idx}', f'genre{idx}') for idx in range(1, 51)),
+    )
+    write_csv(
+        os.path.join(path, 'category.csv'), ('id', 'name', 'slug'),
+        ((idx, f'Категория {idx}', f'category{idx}')
+         for idx in range(1, 11)),
+    )
+    write_csv(
+        os.path.join(path, 'titles.csv'), ('id', 'name', 'year', 'category'),
+        ((idx, f'Произведение {idx}', 1900 + idx % 120, idx % 10 + 1)
+         for idx in range(1, titles + 1)),
+    )
+    write_csv(
+        os.path.join(path, 'genre_title.csv'), ('id', 'title_id', 'genre_id'),
+        ((idx, idx, idx % 50 + 1) for idx in range(1, titles + 1)),
+    )
+    write_csv(
+        os.path.join(path, 'review.csv'),
+        ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+        ((idx + 1, idx % titles + 1, f'Отзыв {idx}', idx // titles + 1,
+          idx % 10 + 1, date) for idx in range(rows)),
+    )
+    write_csv(
+        os.path.join(path, 'comments.csv'),
+        ('id', 'review_id', 'text', 'author', 'pub_date'),
+        ((idx + 1, idx + 1, f'Комментарий {idx}', idx % users + 1, date)
+         for idx in range(rows)),
+    )
+
+
+def fill_database(rows):
+    """Insert synthetic catalog with raw executemany."""
+    from django.db import connection, transaction
+
+    titles = max(rows // 100, 1)
+    users = max(rows // titles, 1) * 2
+    date = '2020-01-01 00:00:{:02d}.{:06d}'
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(
+            'INSERT INTO reviews_user (id, username, email, password, '
+            'is_superuser, is_staff, is_active, first_name, last_name, '
+            'date_joined, role) VALUES (%s, %s, %s, "", 0, 0, 1, "", "", '
+            '"2020-01-01", "user")',
+            ((idx, f'user{idx}', f'user{idx}@yamdb.fake')
+             for idx in range(1, users + 1)),
+        )
+        cursor.executemany(
+            'INSERT INTO reviews_category (id, name, slug) '
+            'VALUES (%s, %s, %s)',
+            ((idx, f'Категория {idx}', f'category{idx}')
+             for idx in range(1, 11)),
+        )
+        cursor.executemany(
+            'INSERT INTO reviews_title (id, name, year, description, '
+            'category_id, rating_sum, rating_count) '
+            'VALUES (%s, %s, %s, "", %s, 0, 0)',
+            ((idx, f'Произведение {(idx * 7919) % titles}',
+              1900 + idx % 120, idx % 10 + 1)
+             for idx in range(1, titles + 1)),
+        )
+        cursor.executemany(
+            'INSERT INTO reviews_genre (id, name, slug) VALUES (%s, %s, %s)',
+            ((idx, f'Жанр {idx}', f'genre{idx}') for idx in range(1, 51)),
+        )
+        cursor.executemany(
+            'INSERT INTO reviews_title_genre (title_id, genre_id) '
+            'VALUES (%s, %s)',
+            ((title, genre) for title in range(1, titles + 1)
+             for genre in {title % 50 + 1, title * 7 % 50 + 1}),
+        )
+        cursor.executemany(
+            'INSERT INTO reviews_review (id, title_id, text, author_id, '
+            'score, pub_date) VALUES (%s, %s, "text", %s, %s, %s)',
+            ((idx + 1, idx % titles + 1, idx // titles + 1, idx % 10 + 1,
+              date.format(idx % 60, idx % 999999))
+             for idx in range(rows)),
+        )
+        cursor.executemany(
+            'INSERT INTO reviews_comment (id, review_id, text, author_id, '
+            'pub_date) VALUES (%s, %s, "text", %s, %s)',
+            ((idx + 1, idx % rows + 1, idx % users + 1,
+              date.format(idx % 60, idx % 999999))
+             for idx in range(rows)),
+        )
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
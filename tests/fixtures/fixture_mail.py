@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def immediate_mail_queue(settings):
+    settings.MAIL_QUEUE = {
+        **settings.MAIL_QUEUE,
+        'BACKEND': 'api.mail.ImmediateMailQueue',
+    }
@@ -0,0 +1,11 @@
+import pytest
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix):
+    from django.conf import settings
+
+    settings.DATABASES['replica'] = {
+        **settings.DATABASES['default'],
+        'TEST': {'MIRROR': 'default'},
+    }
@@ -0,0 +1,12 @@
+import pytest
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(django_db_setup, django_db_blocker):
+    # Apps synced without running migrations miss the search structures
+    # of reviews.0013_search.
+    from api.search import get_search_backend
+    from django.db import connection
+
+    with django_db_blocker.unblock():
+        get_search_backend().setup(connection)
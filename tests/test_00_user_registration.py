@@ -1,8 +1,19 @@
 from http import HTTPStatus
 
 import pytest
+from api.authentication import RoleAccessToken
+from api.mail import ImmediateMailQueue, get_mail_queue
+from api.throttling import ConfirmationCodeUsernameThrottle
+from api.views import SignInView
+from asgiref.sync import async_to_sync
 from django.core import mail
+from django.core.cache.backends.base import memcache_key_warnings
+from django.db import connection
 from django.db.utils import IntegrityError
+from django.test import AsyncRequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
 from tests.utils import (invalid_data_for_user_patch_and_creation,
                          invalid_data_for_username_and_email_fields)
@@ -373,3 +384,176 @@ class Test00UserRegistration:
             'пользователя, созданного администратором,  возвращает ответ '
             'со статусом 200.'
         )
+
+    def test_signup_mail_sent_from_queue(self, client, settings):
+        settings.MAIL_QUEUE = {
+            **settings.MAIL_QUEUE,
+            'BACKEND': 'api.mail.ThreadPoolMailQueue',
+        }
+        outbox_before_count = len(mail.outbox)
+        for idx in range(3):
+            response = client.post(self.url_signup, data={
+                'email': f'queued{idx}@yamdb.fake',
+                'username': f'queued_{idx}'
+            })
+            assert response.status_code == HTTPStatus.OK
+
+        assert get_mail_queue().flush(timeout=5), (
+            'Проверьте, что письма из очереди отправляются.'
+        )
+        assert len(mail.outbox) == outbox_before_count + 3, (
+            f'Если POST-запрос, отправленный на эндпоинт `{self.url_signup}`, '
+            'содержит корректные данные - письмо с кодом подтверждения '
+            'должно быть отправлено из очереди.'
+        )
+
+    def test_mail_batch_retries_unsent_messages(self, monkeypatch):
+        sent = []
+        failures = [2]
+
+        class FlakyConnection:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                return False
+
+            def send_messages(self, messages):
+                for message in messages:
+                    if len(sent) == failures[0]:
+                        failures[0] = None
+                        raise OSError('connection lost')
+                    sent.append(message.to[0])
+                return len(messages)
+
+        monkeypatch.setattr('api.mail.get_connection',
+                            lambda **kwargs: FlakyConnection())
+        mail_queue = ImmediateMailQueue(retry_backoff=0)
+        messages = [
+            mail_queue.build_message('Код', 'code', [f'user{idx}@yamdb.fake'])
+            for idx in range(4)
+        ]
+        assert mail_queue.send_batch(messages)
+        assert sent == [f'user{idx}@yamdb.fake' for idx in range(4)], (
+            'Проверьте, что после сбоя повторно отправляются только '
+            'неотправленные письма пакета.'
+        )
+
+    def test_signup_async_view(self, settings):
+        settings.ASYNC_VIEWS = True
+        view = SignInView.as_view()
+        outbox_before_count = len(mail.outbox)
+        response = async_to_sync(view)(AsyncRequestFactory().post(
+            self.url_signup,
+            {'email': 'async@yamdb.fake', 'username': 'async_user'},
+            content_type='application/json',
+        ))
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что асинхронная регистрация возвращает ответ со '
+            'статусом 200.'
+        )
+        assert len(mail.outbox) == outbox_before_count + 1, (
+            'Проверьте, что при асинхронной регистрации отправляется письмо '
+            'с кодом подтверждения.'
+        )
+
+    def test_obtain_jwt_token_with_confirmation_code(self, client):
+        valid_data = {
+            'email': 'valid@yamdb.fake',
+            'username': 'valid_username'
+        }
+        client.post(self.url_signup, data=valid_data)
+        token_data = {
+            'username': valid_data['username'],
+            'confirmation_code': mail.outbox[-1].body
+        }
+
+        response = client.post(self.url_token, data=token_data)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что POST-запрос с кодом подтверждения из письма, '
+            f'отправленный на эндпоинт `{self.url_token}`, возвращает ответ '
+            'со статусом 200.'
+        )
+        assert 'token' in response.json()
+        token = AccessToken(response.json()['token'])
+        assert (token['username'], token['role']) == (
+            valid_data['username'], 'user'
+        ), (
+            f'Проверьте, что токен, выданный эндпоинтом `{self.url_token}`, '
+            'содержит имя и роль пользователя.'
+        )
+
+        response = client.post(self.url_token, data=token_data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что код подтверждения нельзя использовать повторно.'
+        )
+
+        for _ in range(5):
+            response = client.post(self.url_token, data=token_data)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Проверьте, что число попыток на эндпоинте `{self.url_token}` '
+            'ограничено.'
+        )
+
+    def test_obtain_jwt_token_throttle_key(self, client):
+        throttle = ConfirmationCodeUsernameThrottle()
+        for username in ('user name', 'x' * 300, ['list']):
+            key = throttle.get_cache_key(
+                type('Request', (), {'data': {'username': username}})(), None
+            )
+            assert not list(memcache_key_warnings(key)), (
+                'Проверьте, что ключ ограничения попыток по имени '
+                f'пользователя допустим для memcached: `{key}`.'
+            )
+        response = client.post(self.url_token, data={
+            'username': 'x' * 300, 'confirmation_code': '0'
+        })
+        assert response.status_code != HTTPStatus.INTERNAL_SERVER_ERROR
+
+    def test_jwt_token_role_claims(self, client, admin, settings):
+        token = RoleAccessToken.for_user(admin)
+        assert (token['role'], token['is_superuser'], token['ver']) == (
+            'admin', False, settings.AUTH_TOKEN_VERSION
+        )
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        stateful = settings.AUTH_USER_CACHE
+        settings.AUTH_USER_CACHE = {**stateful, 'STATELESS': True}
+        with CaptureQueriesContext(connection) as context:
+            response = client.post('/api/v1/genres/',
+                                   data={'name': 'Драма', 'slug': 'drama'})
+        assert response.status_code == HTTPStatus.CREATED
+        user_queries = [query['sql'] for query in context.captured_queries
+                        if 'reviews_user' in query['sql']]
+        assert not user_queries, (
+            'Проверьте, что в режиме `STATELESS` запись администратора '
+            'авторизуется по ролям из токена без запроса пользователя. '
+            f'Запросы: {user_queries}'
+        )
+
+        settings.AUTH_USER_CACHE = stateful
+        admin.role = 'user'
+        admin.save()
+        response = client.post('/api/v1/genres/',
+                               data={'name': 'Триллер', 'slug': 'thriller'})
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что без режима `STATELESS` администратор, лишённый '
+            'роли, теряет право записи до истечения токена.'
+        )
+        admin.role = 'admin'
+        admin.save()
+
+        settings.AUTH_TOKEN_VERSION += 1
+        response = client.post('/api/v1/genres/',
+                               data={'name': 'Комедия', 'slug': 'comedy'})
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что после смены `AUTH_TOKEN_VERSION` выданные ранее '
+            'токены не принимаются.'
+        )
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(admin)}'
+        )
+        response = client.post('/api/v1/genres/',
+                               data={'name': 'Комедия', 'slug': 'comedy'})
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
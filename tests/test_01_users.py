@@ -1,6 +1,10 @@
 from http import HTTPStatus
 
 import pytest
+from api.authentication import RoleAccessToken
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 
 from tests.utils import (check_pagination,
                          invalid_data_for_user_patch_and_creation)
@@ -552,3 +556,56 @@ class Test01UserAPI:
             'Проверьте, что PATCH-запрос к `/api/v1/users/me/` с ключом '
             '`role` не изменяет роль пользователя.'
         )
+
+    def test_11_auth_user_cache(self, admin_client, user_client, user):
+        url = '/api/v1/categories/'
+        admin_client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        user_queries = [query['sql'] for query in context.captured_queries
+                        if 'reviews_user' in query['sql']]
+        assert not user_queries, (
+            'Проверьте, что повторный запрос с тем же токеном не загружает '
+            f'пользователя из базы данных. Запросы: {user_queries}'
+        )
+
+        assert user_client.get('/api/v1/users/').status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        admin_client.patch(f'/api/v1/users/{user.username}/',
+                           data={'role': 'admin'})
+        assert user_client.get('/api/v1/users/').status_code == (
+            HTTPStatus.OK
+        ), (
+            'Проверьте, что изменение роли пользователя сразу учитывается '
+            'при проверке прав доступа.'
+        )
+
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), (
+            'Проверьте, что токен удалённого пользователя не принимается.'
+        )
+
+    def test_12_auth_stateless_claims(self, settings, admin):
+        settings.AUTH_USER_CACHE = {**settings.AUTH_USER_CACHE,
+                                    'STATELESS': True}
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(admin)}'
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = client.post('/api/v1/categories/',
+                                   data={'name': 'Фильм', 'slug': 'films'})
+        assert response.status_code == HTTPStatus.CREATED
+        user_queries = [query['sql'] for query in context.captured_queries
+                        if 'reviews_user' in query['sql']]
+        assert not user_queries, (
+            'Проверьте, что в режиме `STATELESS` роль берётся из токена '
+            f'без запроса к базе данных. Запросы: {user_queries}'
+        )
+        assert client.get('/api/v1/users/me/').json()['email'] == (
+            admin.email
+        )
@@ -1,9 +1,27 @@
+import asyncio
+import importlib
+import time
 from http import HTTPStatus
 
 import pytest
+from api.cache import (get_group_version, get_response_cache,
+                       invalidate_groups, response_cache_key)
+from api.references import get_references
+from api.search import LikeSearch, SQLiteTrigramSearch, get_search_backend
+from api.views import TitleViewSet
+from asgiref.sync import async_to_sync
+from django.core.cache.backends import locmem
+from django.core.cache.backends.base import memcache_key_warnings
+from django.db import connection, connections, transaction
+from django.test import AsyncRequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from reviews.models import Category, Genre, Review, Title
 
 from tests.utils import (check_pagination, check_permissions,
-                         create_categories, create_genre, create_titles)
+                         count_list_queries, create_categories, create_genre,
+                         create_single_review, create_titles)
 
 
 @pytest.mark.django_db(transaction=True)
@@ -316,3 +334,404 @@ class Test04TitleAPI:
                           HTTPStatus.FORBIDDEN)
         check_permissions(moderator_client, url, data, 'модератора',
                           titles, HTTPStatus.FORBIDDEN)
+
+    def test_06_titles_keyset_pagination(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/'
+
+        response = client.get(f'{url}?pagination=cursor&limit=1')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что GET-запрос к `/api/v1/titles/?pagination=cursor` '
+            'возвращает ответ со статусом 200.'
+        )
+        data = response.json()
+        assert 'count' not in data and data['previous'] is None, (
+            'Проверьте, что в режиме `pagination=cursor` ответ не содержит '
+            'ключа `count`.'
+        )
+        names = [element['name'] for element in data['results']]
+        response = client.get(data['next'])
+        data = response.json()
+        names += [element['name'] for element in data['results']]
+        assert names == sorted(title['name'] for title in titles), (
+            'Проверьте, что в режиме `pagination=cursor` произведения '
+            'отдаются постранично в порядке названия.'
+        )
+        assert data['next'] is None
+
+    def test_07_titles_constant_queries(self, client, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        url = '/api/v1/titles/'
+        for idx in range(6):
+            admin_client.post(url, data={
+                'name': f'Произведение {idx}',
+                'year': 2000 + idx,
+                'genre': [genre['slug'] for genre in genres],
+                'category': categories[idx % 2]['slug'],
+                'description': 'Описание'
+            })
+
+        queries = count_list_queries(client, url, (1, 6))
+        assert queries[0] == queries[1], (
+            f'Проверьте, что GET-запрос к `{url}` выполняет одинаковое '
+            'количество запросов к базе данных независимо от размера '
+            f'страницы. Сейчас: {queries}.'
+        )
+
+    def test_08_titles_cache_invalidation(self, client, admin_client):
+        titles, categories, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert client.get(url).json()['rating'] is None
+
+        create_single_review(admin_client, titles[0]['id'], 'Отзыв', 7)
+        assert client.get(url).json()['rating'] == 7, (
+            'Проверьте, что после нового отзыва GET-запрос к '
+            '`/api/v1/titles/{title_id}/` возвращает обновлённый рейтинг.'
+        )
+
+        admin_client.delete(f'/api/v1/categories/{categories[0]["slug"]}/')
+        assert client.get(url).json()['category'] is None, (
+            'Проверьте, что после удаления категории GET-запрос к '
+            '`/api/v1/titles/{title_id}/` не возвращает удалённую категорию.'
+        )
+
+    def test_09_titles_name_search(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/'
+
+        for value, expected in (('ерминат', 1), ('КРЕПКИЙ', 1), ('р', 2)):
+            response = client.get(f'{url}?name={value}')
+            assert len(response.json()['results']) == expected, (
+                f'Проверьте, что для эндпоинта `{url}` фильтр `name` '
+                'находит произведения по части названия без учёта регистра.'
+            )
+
+        admin_client.patch(f'{url}{titles[0]["id"]}/',
+                           data={'name': 'Чужой'})
+        response = client.get(f'{url}?name=ужой')
+        assert len(response.json()['results']) == 1, (
+            f'Проверьте, что для эндпоинта `{url}` фильтр `name` находит '
+            'произведения по изменённому названию.'
+        )
+        response = client.get(f'{url}?name=ерминат')
+        assert len(response.json()['results']) == 0
+
+    def test_10_titles_exact_slug_filter(self, client, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        url = '/api/v1/titles/?slug_match=exact'
+
+        cases = (
+            (f'genre={genres[0]["slug"]},{genres[2]["slug"]}', 2),
+            (f'genre={genres[1]["slug"]}', 1),
+            (f'genre={genres[1]["slug"][:3]}', 0),
+            (f'category={categories[1]["slug"]}', 1),
+            (f'category={categories[1]["slug"]}&genre={genres[0]["slug"]}',
+             0),
+        )
+        for query, expected in cases:
+            response = client.get(f'{url}&{query}')
+            assert response.status_code == HTTPStatus.OK
+            assert response.json()['count'] == expected, (
+                'Проверьте, что в режиме `slug_match=exact` произведения '
+                'фильтруются по точному совпадению slug жанра и категории. '
+                f'Запрос: `{url}&{query}`.'
+            )
+
+    def test_11_titles_reference_cache(self, client, admin_client):
+        _, categories, genres = create_titles(admin_client)
+        data = {
+            'name': 'Кэш',
+            'year': 2000,
+            'genre': [genre['slug'] for genre in genres],
+            'category': categories[0]['slug'],
+            'description': 'Описание',
+        }
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post('/api/v1/titles/', data=data)
+        assert response.status_code == HTTPStatus.CREATED
+        lookups = [query['sql'] for query in context.captured_queries
+                   if '"slug" =' in query['sql']]
+        assert not lookups, (
+            'Проверьте, что при создании произведения категория и жанры '
+            'берутся из кэша, а не запрашиваются по `slug`. '
+            f'Запросы: {lookups}'
+        )
+
+        category = Category.objects.get(slug=categories[0]['slug'])
+        category.name = 'Новое имя'
+        category.save()
+        response = client.get(f'/api/v1/titles/{response.json()["id"]}/')
+        assert response.json()['category']['name'] == 'Новое имя', (
+            'Проверьте, что после изменения категории произведение '
+            'отображается с новым названием категории.'
+        )
+
+    def test_12_titles_bulk_create(self, client, user_client, admin_client):
+        categories = create_categories(admin_client)
+        genres = create_genre(admin_client)
+        url = '/api/v1/titles/bulk/'
+        data = [
+            {
+                'name': f'Произведение {idx}',
+                'year': 2000 + idx,
+                'genre': [genres[idx % 3]['slug'], genres[2]['slug']],
+                'category': categories[idx % 2]['slug'],
+                'description': 'Описание',
+            }
+            for idx in range(5)
+        ]
+        response = user_client.post(url, data=data, format='json')
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что POST-запрос пользователя к `{url}` возвращает '
+            'ответ со статусом 403.'
+        )
+
+        invalid = data + [{'name': 'Без года', 'genre': ['unknown'],
+                           'description': 'Описание'}]
+        response = admin_client.post(url, data=invalid, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert errors[:5] == [{}] * 5 and {'year', 'genre'} <= set(
+            errors[5]
+        ), (
+            f'Проверьте, что POST-запрос к `{url}` с некорректным объектом '
+            'возвращает ошибки для каждого объекта массива.'
+        )
+        assert client.get('/api/v1/titles/').json()['count'] == 0, (
+            f'Проверьте, что при ошибке POST-запрос к `{url}` не создаёт '
+            'произведений.'
+        )
+        response = admin_client.post(url, data={'name': 'Объект'},
+                                     format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что POST-запрос к `{url}` с телом не в виде '
+            'списка возвращает ответ со статусом 400.'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(url, data=data, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос администратора к `{url}` с '
+            'корректными данными возвращает ответ со статусом 201.'
+        )
+        inserts = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('INSERT INTO "reviews_title"')
+        ]
+        assert len(inserts) == 1, (
+            f'Проверьте, что POST-запрос к `{url}` создаёт произведения '
+            f'одним запросом. Сейчас: {len(inserts)}.'
+        )
+        created = response.json()
+        assert len(created) == 5 and all(title['id'] for title in created)
+        title = client.get(f'/api/v1/titles/{created[1]["id"]}/').json()
+        assert title['name'] == 'Произведение 1'
+        assert title['category'] == categories[1]
+        assert sorted(genre['slug'] for genre in title['genre']) == sorted(
+            [genres[1]['slug'], genres[2]['slug']]
+        ), (
+            f'Проверьте, что POST-запрос к `{url}` сохраняет жанры '
+            'произведений.'
+        )
+        assert client.get('/api/v1/titles/').json()['count'] == 5
+
+    @pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+    def test_13_titles_replica_routing(self, client, admin_client, settings):
+        settings.REPLICA_DATABASES = ['replica']
+        settings.REPLICA_READ_YOUR_WRITES = 60
+        url = '/api/v1/titles/'
+
+        def queries(api_client, method, *args, **kwargs):
+            with CaptureQueriesContext(connection) as primary, \
+                    CaptureQueriesContext(connections['replica']) as replica:
+                getattr(api_client, method)(*args, **kwargs)
+            return len(primary.captured_queries), len(
+                replica.captured_queries)
+
+        primary, replica = queries(client, 'get', url)
+        assert primary == 0 and replica > 0, (
+            f'Проверьте, что GET-запрос к `{url}` читает данные из реплики.'
+        )
+        primary, replica = queries(admin_client, 'post', '/api/v1/genres/',
+                                   data={'name': 'Драма', 'slug': 'drama'})
+        assert primary > 0 and replica == 0, (
+            'Проверьте, что POST-запросы выполняются на основной базе.'
+        )
+        primary, replica = queries(admin_client, 'get', url,
+                                   {'genre': 'drama'})
+        assert primary > 0 and replica == 0, (
+            'Проверьте, что после записи пользователь читает данные из '
+            'основной базы.'
+        )
+        primary, replica = queries(client, 'get', url,
+                                   {'genre': 'drama', 'limit': 5})
+        assert primary == 0 and replica > 0
+        for header in ('Bearer a b', 'Bearer invalid'):
+            response = client.get(url, HTTP_AUTHORIZATION=header)
+            assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+                f'Проверьте, что GET-запрос к `{url}` с заголовком '
+                f'`Authorization: {header}` возвращает ответ со статусом 401.'
+            )
+
+        settings.REPLICA_READ_YOUR_WRITES = 0
+        admin_client.post('/api/v1/genres/',
+                          data={'name': 'Комедия', 'slug': 'comedy'})
+        primary, replica = queries(admin_client, 'get', url,
+                                   {'genre': 'comedy'})
+        assert primary == 0 and replica > 0, (
+            'Проверьте, что по истечении `REPLICA_READ_YOUR_WRITES` '
+            'пользователь снова читает данные из реплики.'
+        )
+
+    def test_14_titles_async_view(self, client, admin_client, settings):
+        create_titles(admin_client)
+        settings.ASYNC_VIEWS = True
+        view = TitleViewSet.as_view({'get': 'list', 'post': 'create'})
+        assert asyncio.iscoroutinefunction(view), (
+            'Проверьте, что при `ASYNC_VIEWS` представление произведений '
+            'асинхронное.'
+        )
+        response = async_to_sync(view)(
+            AsyncRequestFactory().get('/api/v1/titles/')
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что асинхронное представление `/api/v1/titles/` '
+            'возвращает ответ со статусом 200.'
+        )
+        expected = client.get('/api/v1/titles/')
+        assert response.content == expected.content, (
+            'Проверьте, что асинхронное представление `/api/v1/titles/` '
+            'возвращает те же данные, что и синхронное.'
+        )
+        response = async_to_sync(view)(
+            AsyncRequestFactory().post('/api/v1/titles/', {})
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_15_titles_cached_validators(self, client, admin_client):
+        titles, _, genres = create_titles(admin_client)
+        url = '/api/v1/titles/'
+        params = {'genre': genres[0]['slug'], 'name': 'Терм'}
+        etag = client.get(url, params).get('ETag')
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, params)
+            not_modified = client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        assert response.get('ETag') == etag
+        assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+        assert not context.captured_queries, (
+            f'Проверьте, что GET-запрос к `{url}`, ответ на который есть в '
+            'кэше, не обращается к базе данных. Запросы: '
+            f'{[query["sql"] for query in context.captured_queries]}'
+        )
+
+        admin_client.patch(f'{url}{titles[0]["id"]}/',
+                           data={'description': 'New'})
+        response = client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после изменения произведения GET-запрос к '
+            f'`{url}` с прежним `If-None-Match` возвращает ответ со '
+            'статусом 200.'
+        )
+
+    def test_16_titles_references_added_elsewhere(self, client,
+                                                  admin_client):
+        titles, _, genres = create_titles(admin_client)
+        get_references(Category)
+        get_references(Genre)
+        # Rows created by another process send no signals to this one.
+        Category.objects.bulk_create([Category(name='Сериал', slug='series')])
+        genre = Genre.objects.bulk_create([Genre(name='Триллер',
+                                                 slug='thriller')])[0]
+        genre = Genre.objects.get(slug=genre.slug)
+        Title.genre.through.objects.bulk_create([
+            Title.genre.through(title_id=titles[0]['id'], genre_id=genre.pk)
+        ])
+
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Новое', 'year': 2000, 'genre': [genres[0]['slug']],
+            'category': 'series', 'description': 'Описание',
+        })
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что категория, отсутствующая в кэше, ищется в базе '
+            'данных при создании произведения.'
+        )
+        response = client.get('/api/v1/titles/',
+                              {'genre': 'thriller', 'slug_match': 'exact'})
+        assert response.json()['count'] == 1, (
+            'Проверьте, что жанр, отсутствующий в кэше, ищется в базе '
+            'данных при фильтрации произведений.'
+        )
+
+
+    def test_17_titles_cache_invalidation_on_commit(self, client,
+                                                    admin_client, admin):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        with transaction.atomic():
+            Review.objects.create(title_id=titles[0]['id'], author=admin,
+                                  text='Отзыв', score=7)
+            # A concurrent read before the commit still sees no review.
+            version = get_group_version('titles')
+        assert get_group_version('titles') != version, (
+            'Проверьте, что версия группы кэша меняется после фиксации '
+            'транзакции, изменившей данные.'
+        )
+        assert client.get(url).json()['rating'] == 7
+
+        request = Request(APIRequestFactory().get(
+            '/api/v1/titles/', {'name': 'Длинное название произведения' * 4}
+        ))
+        key = response_cache_key('titles', request)
+        assert not list(memcache_key_warnings(key)), (
+            f'Проверьте, что ключ кэша ответов допустим для memcached: `{key}`.'
+        )
+
+    def test_18_titles_stable_validators(self, client, admin_client,
+                                         settings, monkeypatch):
+        create_titles(admin_client)
+        url = '/api/v1/titles/'
+        etag = client.get(url).get('ETag')
+        # Another worker with its own response cache, sharing the default.
+        get_response_cache().clear()
+        assert client.get(url).get('ETag') == etag, (
+            f'Проверьте, что `ETag` ответа на GET-запрос к `{url}` зависит '
+            'только от данных и версии группы в общем кэше.'
+        )
+
+        invalidate_groups('titles')
+        version = get_group_version('titles')
+        later = time.time() + 10 * settings.RESPONSE_CACHE_TIMEOUT
+        monkeypatch.setattr(locmem.time, 'time', lambda: later)
+        assert get_group_version('titles') == version, (
+            'Проверьте, что версии групп кэша не истекают.'
+        )
+
+    def test_19_titles_search_migration(self, client, admin_client,
+                                        monkeypatch):
+        create_titles(admin_client)
+        migration = importlib.import_module('reviews.migrations.0013_search')
+        fts = SQLiteTrigramSearch.search_table(Title, 'name')
+        url = '/api/v1/titles/?name=ерминат'
+
+        with connection.schema_editor() as schema_editor:
+            migration.teardown_search(None, schema_editor)
+        assert fts not in connection.introspection.table_names(), (
+            'Проверьте, что откат миграции удаляет структуры поиска.'
+        )
+        with connection.schema_editor() as schema_editor:
+            migration.setup_search(None, schema_editor)
+        assert fts in connection.introspection.table_names()
+        assert client.get(url).json()['count'] == 1, (
+            'Проверьте, что миграция поиска индексирует существующие '
+            'произведения.'
+        )
+
+        monkeypatch.setattr(SQLiteTrigramSearch, 'available',
+                            lambda self, connection: False)
+        monkeypatch.setattr('api.search._backends', {})
+        assert type(get_search_backend()) is LikeSearch, (
+            'Проверьте, что без токенизатора `trigram` поиск выполняется '
+            'через `LikeSearch`.'
+        )
@@ -1,10 +1,17 @@
+from datetime import datetime, timezone
 from http import HTTPStatus
 
 import pytest
+from django.db import connection
+from django.db.models.signals import pre_delete
 from django.db.utils import IntegrityError
+from django.test.utils import CaptureQueriesContext
+from reviews.management.commands.rebuild_ratings import rebuild_ratings
+from reviews.models import Review, Title
 
-from tests.utils import (check_fields, check_pagination, create_reviews,
-                         create_single_review, create_titles)
+from tests.utils import (check_fields, check_pagination, count_list_queries,
+                         create_bulk_users, create_reviews,
+                         create_single_review, create_titles, walk_cursor)
 
 
 @pytest.mark.django_db(transaction=True)
@@ -384,3 +391,283 @@ class Test05ReviewAPI:
                 f'Проверьте, что DELETE-запрос {role} к чужому отзыву через '
                 f'`{url_template}` удаляет отзыв.'
             )
+
+    def test_06_reviews_constant_queries(self, client, admin_client,
+                                         django_user_model):
+        titles, _, _ = create_titles(admin_client)
+        Review.objects.bulk_create(
+            Review(title_id=titles[0]['id'], author=author, text='text',
+                   score=5)
+            for author in create_bulk_users(django_user_model, 1000)
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+
+        queries = count_list_queries(client, url, (10, 100, 1000))
+        assert len(set(queries)) == 1, (
+            f'Проверьте, что GET-запрос к `{url}` выполняет одинаковое '
+            'количество запросов к базе данных независимо от размера '
+            f'страницы. Сейчас: {queries}.'
+        )
+
+    def test_07_reviews_conditional_get(self, client, admin_client, admin,
+                                        user_client, user):
+        author_map = {admin: admin_client, user: user_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+
+        response = client.get(url)
+        etag = response.get('ETag')
+        assert etag and response.get('Last-Modified'), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовки `ETag` и `Last-Modified`.'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+
+        user_client.patch(f'{url}{reviews[1]["id"]}/', data={'text': 'New'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после изменения отзыва GET-запрос к `{url}` '
+            'с прежним `If-None-Match` возвращает ответ со статусом 200.'
+        )
+        assert response.get('ETag') != etag
+
+    def test_08_reviews_bulk_create(self, client, admin_client, admin,
+                                    user_client, django_user_model):
+        titles, _, _ = create_titles(admin_client)
+        users = create_bulk_users(django_user_model, 4)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/bulk/'
+        create_single_review(admin_client, titles[0]['id'], 'Отзыв', 2)
+        data = [
+            {'author': author.username, 'text': f'Текст {idx}',
+             'score': idx + 1}
+            for idx, author in enumerate(users)
+        ]
+        response = user_client.post(url, data=data, format='json')
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что POST-запрос пользователя к `{url}` возвращает '
+            'ответ со статусом 403.'
+        )
+
+        invalid = data + [
+            {'author': admin.username, 'text': 'Повтор', 'score': 5},
+            {'author': users[0].username, 'text': 'Повтор', 'score': 5},
+            {'author': 'nobody', 'text': 'Нет автора', 'score': 11},
+        ]
+        response = admin_client.post(url, data=invalid, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert errors[:4] == [{}] * 4, errors
+        assert 'author' in errors[4] and 'author' in errors[5], (
+            f'Проверьте, что POST-запрос к `{url}` отклоняет повторные '
+            'отзывы автора на произведение.'
+        )
+        assert {'author', 'score'} <= set(errors[6])
+        assert Review.objects.count() == 1
+
+        response = admin_client.post(
+            url, data=[{'author': ['x'], 'text': 'Текст', 'score': 5}],
+            format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что POST-запрос к `{url}` с автором не в виде '
+            'строки возвращает ответ со статусом 400.'
+        )
+        assert 'author' in response.json()[0]
+        response = admin_client.post(url, data=5, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что POST-запрос к `{url}` с телом не в виде '
+            'списка возвращает ответ со статусом 400.'
+        )
+
+        response = admin_client.post(url, data=data, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос администратора к `{url}` с '
+            'корректными данными возвращает ответ со статусом 201.'
+        )
+        created = response.json()
+        assert [review['author'] for review in created] == [
+            author.username for author in users
+        ]
+        assert all(review['id'] for review in created)
+        assert Review.objects.filter(title_id=titles[0]['id']).count() == 5
+        rating = client.get(f'/api/v1/titles/{titles[0]["id"]}/').json()[
+            'rating']
+        assert rating == 2, (
+            f'Проверьте, что POST-запрос к `{url}` обновляет рейтинг '
+            'произведения.'
+        )
+
+    def test_09_reviews_rating_aggregates(self, admin_client, admin,
+                                          django_user_model):
+        titles, _, _ = create_titles(admin_client)
+        first, second = (Title.objects.get(pk=title['id'])
+                         for title in titles)
+        authors = create_bulk_users(django_user_model, 3)
+        reviews = [
+            Review.objects.create(title=first, author=author, text='text',
+                                  score=score)
+            for author, score in zip(authors, (2, 4, 9))
+        ]
+
+        def stored(title):
+            title.refresh_from_db()
+            return title.rating_sum, title.rating_count, title.rating
+
+        assert stored(first) == (15, 3, 5.0), (
+            'Проверьте, что создание отзыва обновляет рейтинг произведения.'
+        )
+        reviews[0].score = 8
+        reviews[0].save()
+        assert stored(first) == (21, 3, 7.0), (
+            'Проверьте, что изменение оценки обновляет рейтинг произведения.'
+        )
+        reviews[1].title = second
+        reviews[1].save()
+        assert stored(first) == (17, 2, 8.5)
+        assert stored(second) == (4, 1, 4.0), (
+            'Проверьте, что перенос отзыва на другое произведение обновляет '
+            'рейтинги обоих произведений.'
+        )
+        reviews[2].delete()
+        assert stored(first) == (8, 1, 8.0), (
+            'Проверьте, что удаление отзыва обновляет рейтинг произведения.'
+        )
+        Title.objects.filter(pk=first.pk).update(rating_sum=0,
+                                                  rating_count=0)
+        assert rebuild_ratings() == 2
+        assert stored(first) == (8, 1, 8.0)
+        assert stored(second) == (4, 1, 4.0), (
+            'Проверьте, что `rebuild_ratings` пересчитывает рейтинги по '
+            'отзывам.'
+        )
+
+    def test_10_reviews_rating_drift(self, admin_client, admin,
+                                     django_user_model):
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(pk=titles[0]['id'])
+        authors = create_bulk_users(django_user_model, 3)
+        Review.objects.bulk_create(
+            Review(title=title, author=author, text='text', score=10)
+            for author in authors
+        )
+        authors[0].delete()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            0, 0, None
+        ), (
+            'Проверьте, что рейтинг без учтённых отзывов не уходит ниже нуля '
+            'при удалении отзыва.'
+        )
+
+    def test_11_reviews_title_delete_queries(self, admin_client,
+                                             django_user_model):
+        titles, _, _ = create_titles(admin_client)
+        authors = create_bulk_users(django_user_model, 50)
+        queries = []
+        for title, count in zip(titles, (5, 50)):
+            for author in authors[:count]:
+                Review.objects.create(title_id=title['id'], author=author,
+                                      text='text', score=5)
+            with CaptureQueriesContext(connection) as context:
+                Title.objects.get(pk=title['id']).delete()
+            queries.append(len(context.captured_queries))
+        assert queries[0] == queries[1], (
+            'Проверьте, что удаление произведения не обновляет рейтинг '
+            f'для каждого удаляемого отзыва. Сейчас: {queries}.'
+        )
+
+    def test_12_reviews_title_lookup(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = user_client.get('/api/v1/titles/999/reviews/')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что GET-запрос к отзывам несуществующего '
+            'произведения возвращает ответ со статусом 404.'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'a', 'score': 5})
+        assert response.status_code == HTTPStatus.CREATED
+        review_selects = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_review"' in query['sql']
+        ]
+        assert not review_selects, (
+            f'Проверьте, что POST-запрос к `{url}` не проверяет повторный '
+            'отзыв отдельным запросом, повтор отклоняет ограничение '
+            f'`unique_review`. Сейчас: {review_selects}.'
+        )
+
+        response = user_client.post(url, data={'text': 'b', 'score': 7})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что повторный POST-запрос пользователя к `{url}` '
+            'возвращает ответ со статусом 400.'
+        )
+        assert Review.objects.filter(title_id=titles[0]['id']).count() == 1
+
+    def test_13_reviews_rating_after_failed_title_delete(self, admin_client,
+                                                         admin):
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(pk=titles[0]['id'])
+        review = Review.objects.create(title=title, author=admin,
+                                       text='text', score=6)
+
+        def fail(**kwargs):
+            raise RuntimeError('delete failed')
+
+        pre_delete.connect(fail, sender=Title)
+        try:
+            with pytest.raises(RuntimeError):
+                Title.objects.filter(pk=title.pk).delete()
+        finally:
+            pre_delete.disconnect(fail, sender=Title)
+        review.delete()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (0, 0), (
+            'Проверьте, что после неудачного удаления произведения удаление '
+            'его отзыва обновляет рейтинг.'
+        )
+
+    def test_14_reviews_keyset_pagination(self, client, admin_client,
+                                          django_user_model):
+        titles, _, _ = create_titles(admin_client)
+        authors = create_bulk_users(django_user_model, 7)
+        published = (datetime(2020, 1, 1, tzinfo=timezone.utc),
+                     datetime(2021, 1, 1, tzinfo=timezone.utc))
+        Review.objects.bulk_create(
+            Review(title_id=titles[0]['id'], author=author, text='text',
+                   score=5, pub_date=published[idx % 2])
+            for idx, author in enumerate(authors)
+        )
+        expected = list(
+            Review.objects.filter(title_id=titles[0]['id'])
+            .order_by('-pub_date', '-id').values_list('id', flat=True)
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        assert walk_cursor(client, url, 2) == expected, (
+            f'Проверьте, что в режиме `pagination=cursor` GET-запрос к `{url}` '
+            'отдаёт каждый отзыв один раз, от новых к старым, в том числе '
+            'отзывы с одинаковой датой публикации.'
+        )
+
+    def test_15_reviews_author_rename(self, client, admin_client, user,
+                                      user_client):
+        reviews, titles = create_reviews(admin_client,
+                                         {user: user_client})
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        etag = client.get(url).get('ETag')
+        user_client.patch('/api/v1/users/me/', data={'username': 'renamed'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после переименования автора отзыва GET-запрос к '
+            f'`{url}` с прежним `If-None-Match` возвращает ответ со '
+            'статусом 200.'
+        )
+        assert 'renamed' in {
+            review['author'] for review in response.json()['results']
+        }
@@ -1,9 +1,14 @@
+from datetime import datetime, timezone
 from http import HTTPStatus
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Comment, Review
 
-from tests.utils import (check_fields, check_pagination, create_comments,
-                         create_reviews, create_single_comment)
+from tests.utils import (check_fields, check_pagination, count_list_queries,
+                         create_bulk_users, create_comments, create_reviews,
+                         create_single_comment, walk_cursor)
 
 
 @pytest.mark.django_db(transaction=True)
@@ -381,3 +386,104 @@ class Test06CommentAPI:
             'Проверьте, что DELETE-запрос неавторизованного пользователя к '
             f'`{url}` возвращает ответ со статусом 401.'
         )
+
+    def test_07_comment_title_review_mismatch(self, admin_client, admin,
+                                              user_client, user):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        url = f'/api/v1/titles/{titles[1]["id"]}/reviews/{reviews[0]["id"]}/'
+
+        response = user_client.get(f'{url}comments/')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что GET-запрос к '
+            '`/api/v1/titles/{title_id}/reviews/{review_id}/comments/` для '
+            'отзыва к другому произведению возвращает ответ со статусом 404.'
+        )
+        response = user_client.post(f'{url}comments/', data={'text': 'Ok'})
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что POST-запрос к '
+            '`/api/v1/titles/{title_id}/reviews/{review_id}/comments/` для '
+            'отзыва к другому произведению возвращает ответ со статусом 404.'
+        )
+
+    def test_08_comments_constant_queries(self, client, admin_client, admin,
+                                          django_user_model):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        Comment.objects.bulk_create(
+            Comment(review_id=reviews[0]['id'], author=author, text='text')
+            for author in create_bulk_users(django_user_model, 1000)
+        )
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            f'{reviews[0]["id"]}/comments/'
+        )
+
+        queries = count_list_queries(client, url, (10, 100, 1000))
+        assert len(set(queries)) == 1, (
+            f'Проверьте, что GET-запрос к `{url}` выполняет одинаковое '
+            'количество запросов к базе данных независимо от размера '
+            f'страницы. Сейчас: {queries}.'
+        )
+
+    def test_09_comments_deleted_with_review(self, client, admin_client,
+                                             admin, django_user_model):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        Comment.objects.bulk_create(
+            Comment(review_id=reviews[0]['id'], author=author, text='text')
+            for author in create_bulk_users(django_user_model, 50)
+        )
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            f'{reviews[0]["id"]}/comments/'
+        )
+        etag = client.get(url).get('ETag')
+        comment = Comment.objects.filter(review_id=reviews[0]['id']).first()
+        comment.delete()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == (
+            HTTPStatus.OK
+        ), (
+            f'Проверьте, что после удаления комментария GET-запрос к `{url}` '
+            'с прежним `If-None-Match` возвращает ответ со статусом 200.'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            Review.objects.get(pk=reviews[0]['id']).delete()
+        comment_selects = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_comment"' in query['sql']
+        ]
+        assert not comment_selects, (
+            'Проверьте, что комментарии удаляемого отзыва удаляются одним '
+            'запросом, без загрузки в память.'
+        )
+        assert not Comment.objects.filter(review_id=reviews[0]['id']).exists()
+
+    def test_10_comments_keyset_pagination(self, client, admin_client,
+                                           admin, django_user_model):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        published = (datetime(2020, 1, 1, tzinfo=timezone.utc),
+                     datetime(2021, 1, 1, tzinfo=timezone.utc))
+        Comment.objects.bulk_create(
+            Comment(review_id=reviews[0]['id'], author=author, text='text',
+                    pub_date=published[idx % 2])
+            for idx, author in enumerate(
+                create_bulk_users(django_user_model, 7)
+            )
+        )
+        expected = list(
+            Comment.objects.filter(review_id=reviews[0]['id'])
+            .order_by('pub_date', 'id').values_list('id', flat=True)
+        )
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            f'{reviews[0]["id"]}/comments/'
+        )
+        assert walk_cursor(client, url, 2) == expected, (
+            f'Проверьте, что в режиме `pagination=cursor` GET-запрос к `{url}` '
+            'отдаёт каждый комментарий один раз, от старых к новым, в том '
+            'числе комментарии с одинаковой датой публикации.'
+        )
@@ -0,0 +1,221 @@
+import csv
+import os
+import sqlite3
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+import pytest
+from django.core.management import CommandError, call_command
+from reviews.management.commands.load_data import (BATCH_SIZES,
+                                                   DEFAULT_BATCH_SIZE,
+                                                   csv_serializer,
+                                                   parse_batch_sizes)
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+from tests.conftest import MANAGE_PATH
+
+DATA_PATH = os.path.join(MANAGE_PATH, 'static', 'data')
+
+TABLES = {
+    'users.csv': 'reviews_user',
+    'category.csv': 'reviews_category',
+    'genre.csv': 'reviews_genre',
+    'titles.csv': 'reviews_title',
+    'genre_title.csv': 'reviews_title_genre',
+    'review.csv': 'reviews_review',
+    'comments.csv': 'reviews_comment',
+}
+
+
+def manage(db_name, *args):
+    return subprocess.run(
+        [sys.executable, 'manage.py', *args],
+        cwd=MANAGE_PATH,
+        env={
+            **os.environ,
+            'DB_ENGINE': 'django.db.backends.sqlite3',
+            'DB_NAME': db_name,
+        },
+        capture_output=True,
+        text=True,
+    )
+
+
+def write_catalog(path, rows):
+    """CSV files with shipped headers and ``rows`` by file name."""
+    for file_name in TABLES:
+        with open(os.path.join(DATA_PATH, file_name), encoding='utf8') as f:
+            header = next(csv.reader(f))
+        with open(path / file_name, 'w', newline='', encoding='utf8') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows.get(file_name, ()))
+
+
+def csv_rows(file_name):
+    with open(os.path.join(DATA_PATH, file_name), encoding='utf8') as file:
+        return sum(1 for _ in csv.DictReader(file))
+
+
+class Test08LoadData:
+
+    def test_01_load_data_parallel_workers(self, tmp_path):
+        db_name = str(tmp_path / 'db.sqlite3')
+        assert manage(db_name, 'migrate', '--run-syncdb').returncode == 0
+        result = manage(
+            db_name, 'load_data', '--path', DATA_PATH, '--workers', '4',
+            '--batch-size', '5', '--checkpoint-dir', str(tmp_path)
+        )
+        assert result.returncode == 0, (
+            'Проверьте, что `load_data --workers 4` загружает данные в '
+            f'SQLite без ошибок блокировки: {result.stderr[-500:]}'
+        )
+        with sqlite3.connect(db_name) as connection:
+            for file_name, table in TABLES.items():
+                count, = connection.execute(
+                    f'SELECT COUNT(*) FROM {table}'
+                ).fetchone()
+                assert count == csv_rows(file_name), (
+                    f'Проверьте, что `load_data --workers 4` загружает все '
+                    f'строки файла `{file_name}`.'
+                )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_load_data_update_mode(self, tmp_path, user_superuser):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        title = Title.objects.create(name='Старое', year=1990,
+                                     description='Описание',
+                                     category=category)
+        write_catalog(tmp_path, {
+            'users.csv': [(user_superuser.pk, user_superuser.username,
+                           user_superuser.email, 'user', 'Новое о себе',
+                           '', '')],
+            'titles.csv': [(title.pk, 'Новое', 1991, category.pk)],
+        })
+        checkpoint_dir = tmp_path / 'checkpoints' / 'update'
+
+        call_command('load_data', path=str(tmp_path), mode='update',
+                     checkpoint_dir=str(checkpoint_dir))
+
+        user_superuser.refresh_from_db()
+        title.refresh_from_db()
+        assert user_superuser.bio == 'Новое о себе'
+        assert (
+            user_superuser.is_superuser
+            and user_superuser.check_password('1234567')
+        ), (
+            'Проверьте, что `load_data --mode update` не меняет поля '
+            'пользователя, которых нет в CSV-файле.'
+        )
+        assert (title.name, title.year) == ('Новое', 1991)
+        assert title.description == 'Описание', (
+            'Проверьте, что `load_data --mode update` не меняет поля '
+            'произведения, которых нет в CSV-файле.'
+        )
+        assert (checkpoint_dir / 'titles.csv.checkpoint').exists(), (
+            'Проверьте, что `load_data` создаёт каталог для `--checkpoint-dir`.'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_load_data_export_round_trip(self, tmp_path, admin):
+        published = datetime(2019, 5, 1, 12, 30, tzinfo=timezone.utc)
+        title = Title.objects.create(name='Фильм', year=1990,
+                                     description='Описание')
+        review = Review.objects.create(title=title, author=admin,
+                                       text='Отзыв', score=7,
+                                       pub_date=published)
+        Comment.objects.create(review=review, author=admin, text='Текст',
+                               pub_date=published)
+        export_path = tmp_path / 'export'
+        call_command('export_data', path=str(export_path))
+        Review.objects.all().delete()
+
+        call_command('load_data', path=str(export_path), mode='skip',
+                     checkpoint_dir=str(tmp_path))
+
+        assert Review.objects.get(pk=review.pk).pub_date == published, (
+            'Проверьте, что `load_data` сохраняет дату публикации отзыва '
+            'из CSV-файла.'
+        )
+        assert Comment.objects.get().pub_date == published, (
+            'Проверьте, что `load_data` сохраняет дату публикации '
+            'комментария из CSV-файла.'
+        )
+
+    def test_04_load_data_batch_sizes(self):
+        for values in (['review=20000', '2000'], ['2000', 'review=20000']):
+            sizes = parse_batch_sizes(values)
+            assert (sizes[Review], sizes[Comment], sizes[Title]) == (
+                20000, 2000, 2000
+            ), (
+                'Проверьте, что размер пакета `--batch-size MODEL=N` '
+                'не зависит от порядка относительно `--batch-size N`: '
+                f'{values}.'
+            )
+        sizes = parse_batch_sizes(None)
+        assert sizes[Review] == BATCH_SIZES[Review]
+        assert sizes[Title] == DEFAULT_BATCH_SIZE
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_load_data_streams_batches(self):
+        read = []
+
+        def rows():
+            for idx in range(12):
+                read.append(idx)
+                yield {'id': idx + 1, 'name': f'Жанр {idx}',
+                       'slug': f'genre-{idx}'}
+
+        loaded = csv_serializer(rows(), Genre, batch_size=5)
+        assert next(loaded) == 5
+        assert len(read) <= 6 and Genre.objects.count() == 5, (
+            'Проверьте, что `load_data` читает файл потоково и сохраняет '
+            'каждый пакет отдельно.'
+        )
+        assert list(loaded) == [5, 2]
+        assert Genre.objects.count() == 12
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_load_data_resume(self, tmp_path):
+        genres = [(idx, f'Жанр {idx}', f'genre-{idx}') for idx in range(1, 13)]
+        broken = list(genres)
+        broken[7] = (8, 'Жанр 8', 'genre-1')
+        write_catalog(tmp_path, {'genre.csv': broken})
+        options = {'path': str(tmp_path), 'batch_size': ['5'],
+                   'checkpoint_dir': str(tmp_path)}
+
+        with pytest.raises(CommandError):
+            call_command('load_data', **options)
+        assert Genre.objects.count() == 5
+        Genre.objects.filter(pk=1).delete()
+        write_catalog(tmp_path, {'genre.csv': genres})
+        call_command('load_data', resume=True, **options)
+
+        assert sorted(Genre.objects.values_list('pk', flat=True)) == list(
+            range(2, 13)
+        ), (
+            'Проверьте, что `load_data --resume` загружает только строки '
+            'после последнего сохранённого пакета.'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_07_load_data_skip_mode(self, tmp_path, user):
+        write_catalog(tmp_path, {'users.csv': [
+            (user.pk, 'other', 'other@yamdb.fake', 'user', '', '', ''),
+        ]})
+        call_command('load_data', path=str(tmp_path), mode='skip',
+                     checkpoint_dir=str(tmp_path))
+        assert User.objects.get(pk=user.pk).username == user.username
+
+        write_catalog(tmp_path, {'users.csv': [
+            (user.pk + 1, user.username, 'new@yamdb.fake', 'user', '', '',
+             ''),
+        ]})
+        with pytest.raises(CommandError):
+            call_command('load_data', path=str(tmp_path), mode='skip',
+                         checkpoint_dir=str(tmp_path))
+        assert not User.objects.filter(pk=user.pk + 1).exists(), (
+            'Проверьте, что `load_data --mode skip` пропускает только строки '
+            'с существующим первичным ключом.'
+        )
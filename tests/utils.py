@@ -1,5 +1,8 @@
 from http import HTTPStatus
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 
 check_name_and_slug_patterns = (
     (
@@ -305,3 +308,35 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def count_list_queries(client, url, page_sizes):
+    queries = []
+    for limit in page_sizes:
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'{url}?limit={limit}')
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.json()['results']) == limit
+        queries.append(len(context))
+    return queries
+
+
+def create_bulk_users(django_user_model, count):
+    django_user_model.objects.bulk_create(
+        django_user_model(username=f'bulk{idx}', email=f'bulk{idx}@yamdb.fake')
+        for idx in range(count)
+    )
+    return django_user_model.objects.filter(username__startswith='bulk')
+
+
+def walk_cursor(client, url, limit):
+    ids = []
+    response = client.get(f'{url}?pagination=cursor&limit={limit}')
+    while True:
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data
+        ids += [element['id'] for element in data['results']]
+        if data['next'] is None:
+            return ids
+        response = client.get(data['next'])